@@ -0,0 +1,141 @@
+'''
+Synthetic datapack benchmark
+
+Builds synthetic packs with N recipes, tags, essences and ingredient
+presets, times every phase (build, tag confirmation, folder save, zip
+export, pattern expansion) and records the peak memory of each phase with
+tracemalloc. Every size is run twice: once for the timings, with
+tracemalloc off so its overhead does not skew them, and once for the memory
+peaks. Runs offline, in a temporary directory
+
+Usage:
+    python benchmarks/bench_datapack.py                     # 1k and 10k, compared to the baseline
+    python benchmarks/bench_datapack.py --sizes 1000 10000 100000
+    python benchmarks/bench_datapack.py --save-baseline     # store the results as the new baseline
+
+A phase is reported as a regression when its time or peak memory grows
+more than `--tolerance` (default 25%) over the baseline, the exit code is 1 then
+'''
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pydatapack as pdp
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+WOODS = ["oak", "spruce", "birch", "jungle", "acacia", "dark_oak", "mangrove", "cherry"]
+COLORS = ["white", "orange", "magenta", "light_blue", "yellow", "lime", "pink", "gray",
+          "light_gray", "cyan", "purple", "blue", "brown", "green", "red", "black"]
+
+class Phase:
+    # Times a block, or records the tracemalloc peak reached inside it when tracing
+    def __init__(self, results:dict, name:str):
+        self.results, self.name = results, name
+
+    def __enter__(self):
+        if tracemalloc.is_tracing(): tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        numbers = self.results.setdefault(self.name, {})
+        if tracemalloc.is_tracing(): numbers["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        else: numbers["seconds"] = round(seconds, 4)
+
+def build(size:int) -> pdp.Datapack:
+    # A pack with `size` recipes, tag ids, essences and ingredient presets
+    dp = pdp.Datapack(f"Bench{size}", "Synthetic benchmark pack", 48)
+    dp.def_load()
+    dp.def_tick()
+    for i in range(size):
+        match i % 4:
+            case 0: dp.recipes.shaped(f"bench:item_{i}", ["AAA", "ABA", "AAA"], {"A": f"bench:part_{i}", "B": "minecraft:stick"}, "misc")
+            case 1: dp.recipes.shapeless(f"bench:item_{i}", [f"bench:part_{i}", "minecraft:stick"], "misc")
+            case 2: dp.recipes.smelting(f"bench:item_{i}", f"bench:ore_{i}", 0.1, 200, "misc")
+            case 3: dp.recipes.stonecutting(f"bench:item_{i}", f"bench:stone_{i}")
+        dp.tags.new_tag(f"group_{i % 100}", "item", f"bench:item_{i}")
+        dp.elixirum.new_essence(f"bench:effect_{i}", 3, 1200, "enhancing", 1, 10)
+        dp.elixirum.new_ingredient_preset([f"elixirum:effect_{i}", "elixirum:comfort"], f"bench:ingredient_{i}", 20)
+        dp.elixirum.new_heat_source(f"bench:burner_{i}")
+    dp.elixirum.add_to_whitelist("minecraft:bucket")
+    return dp
+
+def run(size:int, results:dict):
+    # Run every phase once, in a fresh temporary directory
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with Phase(results, "build"): dp = build(size)
+            with Phase(results, "confirm_tags"): dp.tags._confirm_tags()
+            with Phase(results, "save_data"): dp.save_data()
+            with Phase(results, "save_data_incremental"): dp.save_data(incremental=True)
+            with Phase(results, "save_data_incremental_noop"): dp.save_data(incremental=True)
+            with Phase(results, "zip_export"): dp.save_zip(io.BytesIO())
+            pattern = "bench:(" + "|".join(WOODS) + ")_(" + "|".join(COLORS) + ")_(" + "|".join(str(n) for n in range(max(1, size // 128))) + ")"
+            with Phase(results, "pattern_expansion"): sum(1 for _ in dp.iter_ids_from_pattern(pattern))
+        finally:
+            os.chdir(cwd)
+
+def measure(size:int) -> dict:
+    results = {}
+    run(size, results)
+    tracemalloc.start()
+    try: run(size, results)
+    finally: tracemalloc.stop()
+    return results
+
+def compare(results:dict, baseline:dict, tolerance:float) -> list:
+    # Phases slower than the baseline by more than the tolerance
+    regressions = []
+    for size, phases in results.items():
+        for phase, numbers in phases.items():
+            base = baseline.get(size, {}).get(phase)
+            if base is None: continue
+            # Too short or too small to compare reliably
+            if base["seconds"] >= 0.01 and numbers["seconds"] / base["seconds"] > 1 + tolerance:
+                regressions.append(f"{size} {phase}: {base['seconds']} s -> {numbers['seconds']} s (x{numbers['seconds'] / base['seconds']:.2f})")
+            if base["peak_mib"] >= 1 and numbers["peak_mib"] / base["peak_mib"] > 1 + tolerance:
+                regressions.append(f"{size} {phase}: {base['peak_mib']} MiB -> {numbers['peak_mib']} MiB peak (x{numbers['peak_mib'] / base['peak_mib']:.2f})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    logging.getLogger("pydatapack.packcreator").setLevel(logging.CRITICAL)
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = measure(size)
+        print(f"size {size}")
+        for phase, numbers in results[str(size)].items():
+            print(f"  {phase:<28} {numbers['seconds']:>9.4f} s  {numbers['peak_mib']:>9.2f} MiB peak")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as fl: json.dump(results, fl, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with, run with --save-baseline to store one")
+        return 0
+    with open(args.baseline, "r") as fl: baseline = json.load(fl)
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions: print(f"REGRESSION {line}")
+    if not regressions: print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
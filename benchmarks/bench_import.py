@@ -0,0 +1,40 @@
+'''
+Import time benchmark
+
+Imports pydatapack in fresh interpreters, from a directory other than the
+repository root, and reports the wall time and the `-X importtime`
+cumulative time of the package
+
+Usage: python benchmarks/bench_import.py [runs]
+'''
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(cwd: str):
+    # Import the package in a new interpreter, return (wall seconds, importtime microseconds)
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import pydatapack"], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    cumulative = 0
+    for line in proc.stderr.splitlines():
+        if line.rstrip().endswith("| pydatapack"): cumulative = int(line.split("|")[1])
+    return wall, cumulative
+
+def main(runs: int = 20):
+    with tempfile.TemporaryDirectory() as cwd:
+        results = [run_once(cwd) for _ in range(runs)]
+    walls = [r[0] * 1000 for r in results]
+    imports = [r[1] / 1000 for r in results]
+    print(f"runs: {runs}")
+    print(f"interpreter + import wall time: median {statistics.median(walls):.1f} ms, min {min(walls):.1f} ms")
+    print(f"pydatapack import time: median {statistics.median(imports):.1f} ms, min {min(imports):.1f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
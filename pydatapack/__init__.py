@@ -1 +1,8 @@
-from pydatapack.packcreator import Datapack, version_to_pack
\ No newline at end of file
+from pydatapack.packcreator import Datapack, version_to_pack, versions_to_pack
+from pydatapack.id_pattern import IdPattern, compile_pattern
+
+def __getattr__(name: str):
+    # Addon classes (Recipe, Elixirum, Tags) are imported on first access
+    from pydatapack import packcreator
+    if name in packcreator._LAZY_ADDONS: return getattr(packcreator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,142 @@
+import json
+
+from collections.abc import MutableMapping
+
+# Entry types whose data is only read or produced at save time, they are never encoded on registration
+LAZY_TYPES = {"raw", "lines"}
+
+class _Entry:
+    # One output file: either the live data, the encoded bytes, or a slice of the scratch file
+    __slots__ = ("type", "data", "blob", "offset", "length")
+
+    def __init__(self, type:str, data=None, blob:bytes|None=None):
+        self.type = type
+        self.data = data
+        self.blob = blob
+        self.offset = -1
+        self.length = 0
+
+class FileStore(MutableMapping):
+    '''
+    Mapping of output paths to `{"type": ..., "data": ...}` entries, used as `Datapack._files`
+
+    With `compact=True` every entry is encoded to its final bytes as soon as
+    it is registered, so the nested Python objects can be freed\n
+    With a `memory_budget` (in bytes, implies `compact`) the encoded entries
+    are moved to a memory-mapped scratch file once the budget is exceeded\n
+    Compact entries are decoded again when read, so change an entry by
+    assigning it, not by mutating the returned data\n
+    Entries of the `LAZY_TYPES` (files of a loaded pack, streamed function
+    bodies) are kept as they are\n
+    Overwritten and deleted entries leave dead slices in the scratch file,
+    counted in `dead_bytes`: the file is compacted once they are more than
+    half of it
+    '''
+    def __init__(self, encoder, compact:bool=False, memory_budget:int|None=None):
+        self.encoder = encoder
+        self.compact = compact or memory_budget is not None
+        self.memory_budget = memory_budget
+        self.resident_bytes = 0
+        self.dead_bytes = 0
+        self.__entries = {}
+        # path -> entry held as encoded bytes in memory
+        self.__resident = {}
+        self.__scratch = None
+        self.__scratch_size = 0
+        self.__map = None
+
+    def __setitem__(self, path:str, value:dict):
+        if path in self.__entries: self.__release(path)
+        if not self.compact or value["type"] in LAZY_TYPES:
+            self.__entries[path] = _Entry(value["type"], value["data"])
+            return
+        blob = self.encoder(value)
+        entry = self.__entries[path] = _Entry(value["type"], blob=blob)
+        self.__resident[path] = entry
+        self.resident_bytes += len(blob)
+        if self.memory_budget is not None and self.resident_bytes > self.memory_budget: self.__spill()
+
+    def __getitem__(self, path:str) -> dict:
+        entry = self.__entries[path]
+        if entry.blob is None and entry.offset < 0: return {"type":entry.type, "data":entry.data}
+        blob = self.__blob(entry)
+        if entry.type == "json": return {"type":entry.type, "data":json.loads(blob)}
+        return {"type":entry.type, "data":blob.decode("utf-8")}
+
+    def __delitem__(self, path:str):
+        self.__release(path)
+        del self.__entries[path]
+
+    def __release(self, path:str):
+        # Drop the bytes held for an entry about to be replaced or deleted
+        entry = self.__entries[path]
+        if self.__resident.pop(path, None) is not None: self.resident_bytes -= len(entry.blob)
+        elif entry.offset >= 0: self.dead_bytes += entry.length
+
+    def __contains__(self, path) -> bool:
+        return path in self.__entries
+
+    def __iter__(self):
+        return iter(self.__entries)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def entry_type(self, path:str) -> str:
+        return self.__entries[path].type
+
+    def blob(self, path:str) -> bytes|None:
+        # Encoded bytes of an entry, None if it is still held as live data
+        entry = self.__entries[path]
+        if entry.blob is None and entry.offset < 0: return None
+        return self.__blob(entry)
+
+    def encoded(self, path:str) -> bytes:
+        # Bytes written on disk for an entry
+        blob = self.blob(path)
+        return self.encoder(self[path]) if blob is None else blob
+
+    def __blob(self, entry:_Entry) -> bytes:
+        if entry.blob is not None: return entry.blob
+        # Remap the scratch file if it grew since the last read
+        if self.__map is None or len(self.__map) < entry.offset + entry.length:
+            import mmap
+            if self.__map is not None: self.__map.close()
+            self.__scratch.flush()
+            self.__map = mmap.mmap(self.__scratch.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.__map[entry.offset:entry.offset + entry.length]
+
+    def __spill(self):
+        # Move every resident encoded entry to the scratch file
+        if self.__scratch is None:
+            import tempfile
+            self.__scratch = tempfile.TemporaryFile(prefix="pydatapack-")
+        if self.dead_bytes * 2 > self.__scratch_size: self.__compact_scratch()
+        self.__scratch.seek(self.__scratch_size)
+        for entry in self.__resident.values():
+            self.__scratch.write(entry.blob)
+            entry.offset, entry.length = self.__scratch_size, len(entry.blob)
+            self.__scratch_size += entry.length
+            entry.blob = None
+        self.__resident = {}
+        self.resident_bytes = 0
+
+    def __compact_scratch(self):
+        # Copy the live slices to a new scratch file, leaving the dead ones behind
+        import tempfile
+        old, scratch, size = self.__scratch, tempfile.TemporaryFile(prefix="pydatapack-"), 0
+        for entry in self.__entries.values():
+            if entry.offset < 0: continue
+            blob = self.__blob(entry)
+            scratch.write(blob)
+            entry.offset, size = size, size + entry.length
+        if self.__map is not None: self.__map.close()
+        old.close()
+        self.__scratch, self.__scratch_size, self.__map = scratch, size, None
+        self.dead_bytes = 0
+
+    def close(self):
+        # Release the scratch file
+        if self.__map is not None: self.__map.close()
+        if self.__scratch is not None: self.__scratch.close()
+        self.__map = self.__scratch = None
@@ -0,0 +1,74 @@
+from functools import lru_cache
+from itertools import product
+
+class IdPattern:
+    '''
+    A parsed id pattern like `minecraft:(oak|spruce)_(log|wood)`
+
+    Every parenthesized group is a list of alternatives separated by `|`,
+    groups can be nested. Iterating yields the expansions lazily, in the
+    same order as expanding the groups from left to right, and `count()`
+    returns their number without expanding anything
+    '''
+    __slots__ = ("pattern", "_parts")
+
+    def __init__(self, pattern:str):
+        self.pattern = pattern
+        parts, end = _parse(pattern, 0, False)
+        if end != len(pattern): raise ValueError(f"Unbalanced \")\" at position {end} in pattern \"{pattern}\"")
+        self._parts = parts
+
+    def __iter__(self):
+        return _expand(self._parts)
+
+    def count(self) -> int:
+        return _count(self._parts)
+
+    def __repr__(self):
+        return f"IdPattern({self.pattern!r})"
+
+@lru_cache(maxsize=512)
+def compile_pattern(pattern:str) -> IdPattern:
+    # Parse a pattern once, later calls with the same pattern reuse it
+    return IdPattern(pattern)
+
+def _parse(pattern:str, pos:int, in_group:bool):
+    # Parse a sequence up to the end of the pattern, or up to "|" / ")" inside a group
+    # A sequence is a tuple of literal strings and groups, a group is a tuple of sequences
+    parts, literal = [], []
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "(":
+            if literal: parts.append("".join(literal)); literal = []
+            alternatives = []
+            while True:
+                sequence, pos = _parse(pattern, pos + 1, True)
+                alternatives.append(sequence)
+                if pos >= len(pattern): raise ValueError(f"Unclosed \"(\" in pattern \"{pattern}\"")
+                if pattern[pos] == ")": break
+            parts.append(tuple(alternatives))
+            pos += 1
+            continue
+        if char == ")" or (char == "|" and in_group): break
+        literal.append(char)
+        pos += 1
+    if literal: parts.append("".join(literal))
+    return tuple(parts), pos
+
+def _options(part):
+    # Expansions of a single part
+    if isinstance(part, str): return (part,)
+    return tuple(id for sequence in part for id in _expand(sequence))
+
+def _expand(parts:tuple):
+    if all(isinstance(part, str) for part in parts):
+        yield "".join(parts)
+        return
+    for combination in product(*(_options(part) for part in parts)):
+        yield "".join(combination)
+
+def _count(parts:tuple) -> int:
+    total = 1
+    for part in parts:
+        if not isinstance(part, str): total *= sum(_count(sequence) for sequence in part)
+    return total
@@ -0,0 +1,72 @@
+import os
+
+from itertools import chain, islice
+
+# Size of the encoded chunks a line stream is written in
+LINE_CHUNK = 64 * 1024
+
+class LineStream:
+    '''
+    Function body given as command lines, consumed at save time and written in chunks
+
+    `lines` is any iterable of lines, or a function returning one. One-shot
+    iterators (generators) can only be saved once, lists and functions are
+    read again at every save\n
+    With `split`, the body is cut into files of at most `split` lines:
+    `name.mcfunction`, `name_2.mcfunction`... each part ending with a
+    `function <call>_<n>` command running the next one
+    '''
+    __slots__ = ("lines", "split", "call", "consumed")
+
+    def __init__(self, lines, split:int|None=None, call:str|None=None):
+        if split is not None and split < 1: raise ValueError("split must be at least 1")
+        if split is not None and call is None: raise ValueError("A split line stream needs the function id to call its parts")
+        self.lines = lines
+        self.split = split
+        self.call = call
+        self.consumed = False
+
+    def __source(self, path:str):
+        if callable(self.lines): return iter(self.lines())
+        source = iter(self.lines)
+        if source is self.lines:
+            if self.consumed: raise RuntimeError(f"The lines of {path} were consumed by a previous save, pass a list or a function returning the lines to save it again")
+            self.consumed = True
+        return source
+
+    def __chunks(self, lines, state:dict, next_call:str):
+        # Encoded chunks of one part, leaves the first line of the next part in state["next"]
+        buffer, size, separator = [], 0, ""
+        for line in (lines if self.split is None else islice(lines, self.split)):
+            line = separator + line.rstrip("\r\n")
+            separator = "\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= LINE_CHUNK:
+                yield "".join(buffer).encode("utf-8")
+                buffer, size = [], 0
+        if self.split is not None:
+            state["next"] = next(lines, None)
+            if state["next"] is not None: buffer.append(f"{separator}function {next_call}")
+        if buffer: yield "".join(buffer).encode("utf-8")
+        state["done"] = True
+
+    def parts(self, path:str, stream:bool=True):
+        '''
+        Yield the (path, payload) pairs of the files of the body
+
+        With `stream=True` payloads are iterators of byte chunks, read from
+        the lines as they are written: consume every part before asking for
+        the next one. Otherwise they are bytes
+        '''
+        source = self.__source(path)
+        lines, index = source, 1
+        stem, ext = os.path.splitext(path)
+        while True:
+            state = {"next":None, "done":False}
+            part = path if index == 1 else f"{stem}_{index}{ext}"
+            chunks = self.__chunks(lines, state, f"{self.call}_{index + 1}")
+            yield part, chunks if stream else b"".join(chunks)
+            if not state["done"]: raise RuntimeError(f"{part} was not fully written before the next part")
+            if state["next"] is None: return
+            lines, index = chain((state["next"],), source), index + 1
@@ -17,8 +17,12 @@ class ColorFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One formatter per level, built once instead of once per record
+        self.formatters = {level: logging.Formatter(log_fmt, datefmt='%H:%M:%S') for level, log_fmt in self.FORMATS.items()}
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        formatter.datefmt = '%H:%M:%S'
-        return formatter.format(record)
\ No newline at end of file
+        formatter = self.formatters.get(record.levelno)
+        if formatter is None: formatter = self.formatters[logging.INFO]
+        return formatter.format(record)
@@ -1,15 +1,19 @@
 import json
 import os
 import logging
-import re
 
+from bisect import bisect_right
+from functools import cache, cached_property, partial
+from importlib import import_module
+from itertools import islice
+from pydatapack.filestore import FileStore, LAZY_TYPES
+from pydatapack.id_pattern import compile_pattern
+from pydatapack.line_stream import LineStream
 from pydatapack.log_formatter import ColorFormatter
-from shutil import make_archive
-from tempfile import TemporaryDirectory
+from pydatapack.save_stats import SaveStats
 from os import PathLike
-
-# Get current working directory
-cwd = os.getcwd()
+from time import perf_counter
+from typing import BinaryIO
 
 logger_level = logging.DEBUG
 
@@ -17,43 +21,348 @@ logger_level = logging.DEBUG
 logger = logging.getLogger(__name__)
 logger.setLevel(logger_level)
 
-# Create logging stream handler
-ch = logging.StreamHandler()
-ch.setLevel(logger_level)
-ch.setFormatter(ColorFormatter())
-logger.addHandler(ch)
-
-# Load version pack format from JSON file
-with open(os.path.join(cwd, "pydatapack", "ver_pack_format.json") , "r") as vpf: ver_pack_format = json.load(vpf)
-# Load essence_blacklist_file from JSON file
-with open(os.path.join(cwd, "pydatapack", "essence_blacklist_file.json") , "r") as vpf: essence_blacklist_file = json.load(vpf)
-
-# Load all addons
-from pydatapack.packcreator_recipe import Recipe
-from pydatapack.packcreator_elixirum import Elixirum
-from pydatapack.packcreator_tags import Tags
-
-def version_to_pack(version: str):
-    # Convert version string to pack format
-    version = [v for v in version.split(".") if v != "1"]
-    if len(version) == 1: version.append("0")
-    major, minor = int(version[0]), int(version[1])
-    temp = ver_pack_format.get(str(major))
-    if temp and temp["any"]: return temp["val"]
-    for condition in temp["conditions"]:
-        value = int(condition["val"])
-        match condition["type"]:
-            case "less": 
-                if minor <= value: return condition["ver"]
-            case "more": 
-                if minor >= value: return condition["ver"]
-            case "equal": 
-                if minor == value: return condition["ver"]
-            case "between": 
-                if value[0] <= minor <= value[1]: return condition["ver"]
+def _setup_logger():
+    # Attach the logging stream handler, once, when the first Datapack is created
+    if logger.handlers: return
+    ch = logging.StreamHandler()
+    ch.setLevel(logger_level)
+    ch.setFormatter(ColorFormatter())
+    logger.addHandler(ch)
+
+@cache
+def _load_data(file_name: str):
+    # Load a JSON table bundled with the package, cached after the first use
+    from importlib.resources import files
+    return json.loads(files(__package__).joinpath(file_name).read_text(encoding="utf-8"))
+
+# Bundled data tables and addons, loaded on first attribute access
+_LAZY_DATA = {"ver_pack_format": "ver_pack_format.json", "essence_blacklist_file": "essence_blacklist_file.json"}
+_LAZY_ADDONS = {"Recipe": "pydatapack.packcreator_recipe", "Elixirum": "pydatapack.packcreator_elixirum", "Tags": "pydatapack.packcreator_tags"}
+
+def __getattr__(name: str):
+    if name in _LAZY_DATA: return _load_data(_LAZY_DATA[name])
+    if name in _LAZY_ADDONS: return getattr(import_module(_LAZY_ADDONS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _condition_range(condition: dict):
+    # Inclusive (low, high) minor range of a ver_pack_format condition, high is None when open
+    value = condition["val"]
+    match condition["type"]:
+        case "less": return 0, int(value)
+        case "more": return int(value), None
+        case "equal": return int(value), int(value)
+        case "between": return int(value[0]), int(value[1])
+    raise ValueError(f"Unknown pack format condition type \"{condition['type']}\"")
+
+@cache
+def _pack_format_index():
+    '''
+    Used internally
+
+    Compiles ver_pack_format.json once into a sorted interval index per major
+    version: `{major: (starts, formats)}`, where `formats[i]` is the pack
+    format of the minors from `starts[i]` up to `starts[i + 1]` (`None` when
+    no rule matches). The first matching rule wins, as in the JSON order
+    '''
+    index = {}
+    for major, rules in _load_data("ver_pack_format.json").items():
+        if rules["any"]:
+            index[int(major)] = ([0], [rules["val"]])
+            continue
+        ranges = [(*_condition_range(c), c["ver"]) for c in rules["conditions"]]
+        bounds = sorted({0, *(low for low, _, _ in ranges), *(high + 1 for _, high, _ in ranges if high is not None)})
+        starts, formats = [], []
+        for bound in bounds:
+            fmt = next((ver for low, high, ver in ranges if low <= bound and (high is None or bound <= high)), None)
+            if formats and formats[-1] == fmt: continue
+            starts.append(bound)
+            formats.append(fmt)
+        index[int(major)] = (starts, formats)
+    return index
+
+@cache
+def version_to_pack(version: str) -> int:
+    '''
+    Convert a game version string ("1.20.4", "20.4" or "1.21") to its pack format
+
+    Raises ValueError for versions that are not in ver_pack_format.json
+    '''
+    parts = str(version).strip().split(".")
+    if len(parts) > 1 and parts[0] == "1": parts = parts[1:]
+    try: major, minor = int(parts[0]), int(parts[1]) if len(parts) > 1 else 0
+    except ValueError: raise ValueError(f"Invalid game version \"{version}\"") from None
+    entry = _pack_format_index().get(major)
+    if entry is not None:
+        starts, formats = entry
+        fmt = formats[bisect_right(starts, minor) - 1]
+        if fmt is not None: return fmt
+    raise ValueError(f"No pack format known for game version \"{version}\"")
+
+def versions_to_pack(versions) -> list[int]:
+    '''
+    Batch version of `version_to_pack`
+
+    Takes any iterable of version strings (a NumPy array works too) and
+    returns their pack formats in the same order
+    '''
+    if hasattr(versions, "tolist"): versions = versions.tolist()
+    return [version_to_pack(str(v)) for v in versions]
+
+# Suffix of the content-hash manifest kept next to the pack folder by incremental saves
+MANIFEST_NAME = ".pydatapack_manifest.json"
+
+# Fixed timestamp used for every zip entry (the earliest date zip supports)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# JSON output formats of a Datapack
+OUTPUT_FORMATS = ("pretty", "compact", "canonical")
+
+@cache
+def _fast_dumps():
+    # orjson.dumps when orjson is installed, None otherwise
+    try: import orjson
+    except ImportError: return None
+    return orjson.dumps
+
+def _dumps(data, output_format: str = "pretty") -> bytes:
+    '''
+    Serialize JSON data in an output format
+
+    - `pretty`: indented with 4 spaces
+    - `compact`: no whitespace, encoded by orjson when it is installed
+    - `canonical`: no whitespace and sorted keys, always encoded by the
+      standard library so the same data always gives the same bytes
+    '''
+    if output_format == "compact":
+        fast = _fast_dumps()
+        if fast is not None:
+            # orjson rejects what it can't encode exactly (non-str keys, big ints), leave those to json
+            try: return fast(data)
+            except TypeError: pass
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if output_format == "canonical": return json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return json.dumps(data, indent=4).encode("utf-8")
+
+def _encode(entry: dict, output_format: str = "pretty") -> bytes:
+    # Serialize a _files entry to the bytes written on disk
+    if entry["type"] == "json": return _dumps(entry["data"], output_format)
+    if entry["type"] == "raw": return entry["data"].read()
+    return entry["data"].encode("utf-8")
+
+def _write_zip(file: PathLike|str|BinaryIO, entries, compresslevel: int|None = None):
+    # Write (name, bytes or iterable of byte chunks) pairs into a deterministic zip archive
+    import zipfile
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for name, payload in entries:
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o100644 << 16
+            if isinstance(payload, bytes):
+                zf.writestr(info, payload, compresslevel=compresslevel)
+                continue
+            # Same as writestr, which also goes through open(), without holding the whole payload
+            if compresslevel is not None: info._compresslevel = compresslevel
+            with zf.open(info, "w") as entry:
+                for chunk in payload: entry.write(chunk)
+        return sum(info.compress_size for info in zf.infolist())
+
+# Files encoded per worker and batch, and per pool task, by parallel saves
+ENCODE_BATCH = 256
+ENCODE_CHUNK = 32
+
+# Folders renamed to singular in pack format 48, and their older plural names
+PLURAL_FOLDERS = {"function": "functions", "recipe": "recipes", "advancement": "advancements", "loot_table": "loot_tables",
+                  "predicate": "predicates", "item_modifier": "item_modifiers", "structure": "structures"}
+# Tag folders renamed with them
+PLURAL_TAG_FOLDERS = {"function": "functions", "item": "items", "block": "blocks", "entity_type": "entity_types",
+                      "fluid": "fluids", "game_event": "game_events"}
+
+def _func_folder(pack_format) -> str:
+    # Name of the function folder, renamed to singular in pack format 48
+    return "function" if int(pack_format) >= 48 else "functions"
+
+def _folder_layout(path: str):
+    '''
+    Used internally
+
+    (head, (singular, plural), tail) of a path under a folder renamed in
+    pack format 48, in either form, None for the other paths
+    '''
+    parts = path.split(os.sep)
+    if len(parts) > 2:
+        for singular, plural in PLURAL_FOLDERS.items():
+            if parts[1] in (singular, plural): return (parts[0],), (singular, plural), tuple(parts[2:])
+    if len(parts) > 3 and parts[1] == "tags":
+        for singular, plural in PLURAL_TAG_FOLDERS.items():
+            if parts[2] in (singular, plural): return (parts[0], "tags"), (singular, plural), tuple(parts[3:])
+    return None
+
+# Encoded files and their folder layouts shared by the target workers of build_targets
+_target_files = []
+_target_layouts = {}
+
+def _init_target_worker(files: list, layouts: dict):
+    global _target_files, _target_layouts
+    _target_files, _target_layouts = files, layouts
+
+def _emit_target(out_path: str, to_zip: bool, compresslevel: int|None, mcmeta: bytes, pack_format: int, encoded: list|None = None, layouts: dict|None = None):
+    # Write one build_targets target, as a folder or a zip, from the worker globals unless encoded and layouts are given
+    files = []
+    plural = int(pack_format) < 48
+    encoded = _target_files if encoded is None else encoded
+    layouts = _target_layouts if layouts is None else layouts
+    for path, payload in encoded:
+        if path in layouts:
+            head, names, tail = layouts[path]
+            path = os.path.join(*head, names[plural], *tail)
+        files.append((path, payload))
+    if to_zip:
+        entries = sorted(("/".join(("data", *path.split(os.sep))), payload) for path, payload in files)
+        _write_zip(out_path, [("pack.mcmeta", mcmeta), *entries], compresslevel)
+        return
+    created = set()
+    _make_dir(out_path, created)
+    _write_file(os.path.join(out_path, "pack.mcmeta"), mcmeta)
+    _make_dirs(os.path.join(out_path, "data"), _plan_dirs(path for path, _ in files), created)
+    for path, payload in files: _write_file(os.path.join(out_path, "data", path), payload)
+
+def _plan_dirs(paths) -> list:
+    '''
+    Used internally
+
+    Minimal set of leaf directories holding the given file paths: parents
+    of another planned directory are left out, `_make_dirs` creates them
+    '''
+    folders = sorted({tuple(os.path.dirname(path).split(os.sep)) for path in paths} - {("",)})
+    # Sorted tuples put every directory right before its descendants
+    return [os.path.join(*folder) for folder, following in zip(folders, folders[1:] + [None])
+            if following is None or following[:len(folder)] != folder]
+
+def _make_dir(path: str, created: set):
+    # mkdir that creates missing parents, one syscall per directory that is not in `created` yet
+    if path in created: return
+    try: os.mkdir(path)
+    except FileExistsError: pass
+    except FileNotFoundError:
+        _make_dir(os.path.dirname(path), created)
+        try: os.mkdir(path)
+        except FileExistsError: pass
+    created.add(path)
+
+def _make_dirs(root: str, folders, created: set|None = None) -> set:
+    # Create the planned folders under root, returns the set of directories known to exist
+    created = set() if created is None else created
+    for folder in folders: _make_dir(os.path.join(root, folder), created)
+    return created
+
+class _FileWriter:
+    # Writes payloads to disk, through a thread pool when workers are set
+    def __init__(self, workers: int|None = None, stats: SaveStats|None = None):
+        self.stats = stats
+        self.pool = None
+        if workers and workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = []
+        self.limit = (workers or 1) * ENCODE_BATCH
+
+    def write(self, path: str, payload: bytes):
+        if self.stats is not None:
+            # Charge the write, or the wait for the pool, to the write phase
+            start = perf_counter()
+            size = self.__write(path, payload)
+            self.stats.add("write", perf_counter() - start, 1, size)
+            return
+        self.__write(path, payload)
+
+    def __write(self, path: str, payload: bytes) -> int:
+        # Streamed payloads are written in this thread, in order
+        if self.pool is None or not isinstance(payload, bytes): return _write_file(path, payload)
+        self.pending.append(self.pool.submit(_write_file, path, payload))
+        # Bound the payloads held in memory and surface write errors early
+        if len(self.pending) >= self.limit:
+            for future in self.pending: future.result()
+            self.pending = []
+        return len(payload)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is None: return
+        start = perf_counter()
+        try:
+            for future in self.pending: future.result()
+        finally: self.pool.shutdown()
+        if self.stats is not None: self.stats.add("write", perf_counter() - start)
+
+def _write_file(path: str, payload: bytes) -> int:
+    # Write bytes or an iterable of byte chunks, returns the number of bytes written
+    with open(path, "wb") as fl:
+        if isinstance(payload, bytes): return fl.write(payload)
+        return sum(map(fl.write, payload))
+
+def _hashing(chunks, hasher):
+    # Pass byte chunks through, feeding them to a hashlib object
+    for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+
+# Chunk size and number of chunks buffered ahead of the consumer by stream_zip_async
+ZIP_STREAM_CHUNK = 64 * 1024
+ZIP_STREAM_AHEAD = 16
+
+class _ExportCancelled(Exception):
+    # Raised in export threads to stop them once the awaiting task is cancelled
+    pass
+
+def _cancellable(entries, cancelled):
+    # Stop a (name, bytes) iterator as soon as the cancel event is set
+    for entry in entries:
+        if cancelled.is_set(): raise _ExportCancelled()
+        yield entry
+
+class _ChunkSink:
+    '''
+    Used internally
+
+    Write-only, unseekable file object handing the zip output of an export
+    thread to an asyncio consumer in chunks, blocking the thread when the
+    consumer is `ZIP_STREAM_AHEAD` chunks behind
+    '''
+    def __init__(self, loop, chunks, cancelled, chunk_size: int):
+        import threading
+        self.loop, self.chunks, self.cancelled = loop, chunks, cancelled
+        self.slots = threading.Semaphore(ZIP_STREAM_AHEAD)
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        if len(self.buffer) >= self.chunk_size:
+            self.send(bytes(self.buffer))
+            self.buffer.clear()
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def send(self, item):
+        # Hand an item (a chunk, an exception, or None at the end) to the consumer
+        while not self.slots.acquire(timeout=0.1):
+            if self.cancelled.is_set(): raise _ExportCancelled()
+        if self.cancelled.is_set(): raise _ExportCancelled()
+        try: self.loop.call_soon_threadsafe(self.chunks.put_nowait, item)
+        except RuntimeError: raise _ExportCancelled() from None
 
 class Datapack:
-    def __init__(self, name: str, desc: str, pack_format:str, save_to_zip:bool=False, verbose:bool=False):
+    def __init__(self, name: str, desc: str, pack_format:str, save_to_zip:bool=False, verbose:bool=False, compresslevel:int|None=None,
+                 compact_files:bool=False, memory_budget:int|None=None, gen_on_init:bool=True, output_format:str="pretty"):
         # Initialize Datapack class
         self.verbose = verbose
         self.name = name
@@ -61,185 +370,589 @@ class Datapack:
         self.desc = desc
         self.pack_format = pack_format
 
+        _setup_logger()
+        cwd = os.getcwd()
         self.basepath = os.path.join(cwd, name)
         self.datapath = os.path.join(self.basepath,"data")
 
-        self.__folders = [self.namespace]
-        self._files = {}
+        if output_format not in OUTPUT_FORMATS: raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}")
+        self.output_format = output_format
+        self.__encode = partial(_encode, output_format=output_format)
+        self._files = FileStore(self.__encode, compact_files, memory_budget)
         self.__filters = {}
-        self.__all_tags = []
-        self.__tags_name = []
+        self._sources = []
         self.save_to_zip = save_to_zip
 
-        if save_to_zip:
-            if self.verbose: logger.info("Creating temporary directory")
-            self.temp_dir = TemporaryDirectory()
-            self.temp_path = self.temp_dir.name
-            if self.verbose: logger.info(f"Temporary directory created. Path: {self.temp_path}")
-            if self.verbose: logger.info("Changing save path to temporary directory")
-            self.__change_save_path(self.temp_path)
-        self.gen_new()
-
-        self.tags = Tags(self)
-        self.recipes = Recipe(self, self.namespace, self._files, self.__folders, self.__filters, verbose)
-        self.elixirum = Elixirum(self)
-    
-    def __change_save_path(self, path:PathLike|str):
-        # Change the save path
-        self.basepath = path
-        self.datapath = os.path.join(self.basepath,"data")
-    
-    def __make_dir(self, path: PathLike|str, verbose_save: bool = True):
-        # Create a directory if it doesn't exist
-        try: os.mkdir(path)
-        except FileExistsError: 
-            if verbose_save: logger.error(f"Path already exists! Returning...")
-            return
+        self.compresslevel = compresslevel
+        self.zippath = os.path.join(cwd, f"{name}.zip")
+        self.manifestpath = os.path.join(cwd, f"{name}{MANIFEST_NAME}")
 
-    def _add_folder(self, name:str):
+        # Without gen_on_init nothing is written until the pack is saved
+        if gen_on_init: self.gen_new()
+
+    @classmethod
+    def from_pack(cls, path:PathLike|str, name:str|None=None, save_to_zip:bool=False, verbose:bool=False, **kwargs):
         '''
-        Used internally
+        Opens an existing pack (a folder or a zip) to patch it
+
+        Only the file list is read: the files are parsed when accessed with
+        `read_entry`, and the untouched ones are copied byte for byte when
+        saving. Overriding a file (`write_entry`, the recipe, tag and
+        Elixirum methods) replaces it, and tags are merged with the ones of
+        the pack. Description, pack format and filters come from its
+        pack.mcmeta, and `name` defaults to the name of the folder or zip.
+        Nothing is written before `save_data`, and saving to the folder or
+        zip the pack was loaded from raises `ValueError`: its files are
+        still read while saving
+        '''
+        from pydatapack.packloader import PackSource, SourceRef
+        source = PackSource(path)
+        meta = source.mcmeta()
+        pack = cls(name or source.name, meta["pack"].get("description", ""), meta["pack"]["pack_format"], save_to_zip, verbose, gen_on_init=False, **kwargs)
+        pack.__filters.update(meta.get("filter", {}))
+        pack._sources.append(source)
+        for path, member in source.paths(): pack._files[path] = {"type":"raw", "data":SourceRef(source, member)}
+        if verbose: logger.info(f"Loaded {len(pack._files)} files from {source.path}")
+        return pack
+
+    def __check_output(self, path):
+        # Refuse to write over a loaded pack, its files are still read while saving
+        if not isinstance(path, (str, PathLike)) or not os.path.exists(path): return
+        for source in self._sources:
+            if os.path.samefile(path, source.path): raise ValueError(f"Cannot save over the loaded pack {source.path}, give the pack another name")
+
+    def read_entry(self, path:str):
+        '''
+        Parsed content of a file of the pack (a path relative to `data/`)
 
-        Appends a folder to the __folders list\n
-        If it exists returns
+        Files of a loaded pack are read and parsed here, on first access,
+        the returned object is not tracked: pass it to `write_entry` to
+        override the file
+        '''
+        entry = self._files[os.path.join(*path.split("/"))]
+        if entry["type"] != "raw": return entry["data"]
+        payload = entry["data"].read()
+        if path.endswith(".json") or path.endswith(".mcmeta"): return json.loads(payload)
+        return payload.decode("utf-8")
+
+    def write_entry(self, path:str, data:dict|list|str):
+        # Add or override a file of the pack (a path relative to `data/`), strings are written as text
+        path = os.path.join(*path.split("/"))
+        self._files[path] = {"type":"text" if isinstance(data, str) else "json", "data":data}
+        self._index(path, None if isinstance(data, str) else data)
+
+    def close(self):
+        # Release the loaded packs and the file store scratch file
+        for source in self._sources: source.close()
+        self._files.close()
+
+    @cached_property
+    def xref(self):
         '''
-        if name in self.__folders: return
-        self.__folders.append(name)
+        Cross-reference index of the ids used by recipes, tags and Elixirum data
 
-    def _add_folders(self, path:PathLike|str):
+        Built from the registered files on first use, then kept up to date by
+        the recipe, tag and Elixirum methods, packs that never use it don't pay for it
+        '''
+        from pydatapack.xref import XRef, file_refs
+        xref = XRef()
+        for path in self._files:
+            if self._files.entry_type(path) == "json": xref.add(path, file_refs(path, self._files[path]["data"]))
+        if "tags" in vars(self):
+            # Tags are only written to the files when saving
+            for (namespace, tag_type, tag), entry in self.tags._registry.items():
+                xref.add(os.path.join(namespace, "tags", tag_type, f"{tag}.json"), ((id, "tag") for id in entry["values"]))
+        return xref
+
+    def _index(self, path:str, data=None, add:bool=False):
         '''
         Used internally
 
-        Same as _add_folder but for a long *INEXISTENT* path\n
-        If it exists returns
+        Update the cross-reference entry of a JSON file, once the index is built\n
+        `add` adds the references of `data` instead of replacing the file ones
+        '''
+        xref = vars(self).get("xref")
+        if xref is None: return
+        from pydatapack.xref import file_refs
+        refs = file_refs(path, data)
+        if add: xref.add(path, refs)
+        else: xref.set(path, refs)
+
+    def check_references(self) -> list:
         '''
-        path = path.split(os.sep)
-        complex_path = ""
-        for i in range(len(path)):
-            complex_path = os.path.join(complex_path, path[i])
-            self._add_folder(complex_path)
+        Check the cross-reference index for conflicts, see `XRef.check`\n
+        Returns a list of (kind, id, paths) issues, logged as warnings when verbose
+        '''
+        whitelisted = self.elixirum._removed_tags if "elixirum" in vars(self) else ()
+        overwritten = self.recipes._overwritten if "recipes" in vars(self) else ()
+        issues = self.xref.check(_load_data("essence_blacklist_file.json")["essence_blacklist.json"]["values"], whitelisted, overwritten)
+        if self.verbose:
+            for kind, id, paths in issues: logger.warning(f"{kind}: {id} in {paths}")
+        return issues
+
+    @cached_property
+    def tags(self):
+        # Tags addon, imported on first use
+        from pydatapack.packcreator_tags import Tags
+        return Tags(self)
+
+    @cached_property
+    def recipes(self):
+        # Recipe addon, imported on first use
+        from pydatapack.packcreator_recipe import Recipe
+        return Recipe(self, self.namespace, self._files, self.__filters, self.verbose)
+
+    @cached_property
+    def elixirum(self):
+        # Elixirum addon, imported on first use
+        from pydatapack.packcreator_elixirum import Elixirum
+        return Elixirum(self)
+
+    def __confirm_tags(self, stats:SaveStats|None=None):
+        # Confirm the tags, if the tags addon was ever used
+        if "tags" not in vars(self): return
+        if self.verbose: logger.info("Confirming all tags...")
+        if stats is None: return self.tags._confirm_tags()
+        start = perf_counter()
+        self.tags._confirm_tags()
+        stats.add("tags", perf_counter() - start, len(self.tags._registry))
+    
+    def _mcmeta(self):
+        # Build the pack.mcmeta content
+        if len(self.__filters) > 0: return {"pack":{"description":self.desc,"pack_format":self.pack_format}, "filter":self.__filters}
+        return {"pack":{"description":self.desc,"pack_format":self.pack_format}}
 
     def gen_new(self):
         # Generate new datapack
+        if self.save_to_zip:
+            # Zip packs are streamed at save time, nothing to write yet
+            if self.verbose: logger.info("Zip output selected, pack.mcmeta will be written on save")
+            return
         if self.verbose: logger.info("Generating new pack...")
-        self.__make_dir(self.basepath)
-        if self.verbose: logger.info("Basepath generated")
-        with open(os.path.join(self.basepath, "pack.mcmeta"), "w") as mcmeta: 
-            if len(self.__filters) > 0: json.dump({"pack":{"description":self.desc,"pack_format":self.pack_format}, "filter":self.__filters}, mcmeta, indent=4)
-            else: json.dump({"pack":{"description":self.desc,"pack_format":self.pack_format}}, mcmeta, indent=4)
+        _make_dir(self.datapath, set())
+        if self.verbose: logger.info("Basepath and datapath generated")
+        _write_file(os.path.join(self.basepath, "pack.mcmeta"), self.__encode({"type":"json", "data":self._mcmeta()}))
         if self.verbose: logger.info("MCMETA generated")
-        self.__make_dir(self.datapath)
-        if self.verbose: logger.info("Datapath generated")
 
-    def save_data(self, verbose_save:bool|None=None):
-        # Save datapack data
+    def __write_mcmeta(self):
+        # (Re)write pack.mcmeta, the filters may have changed since gen_new
+        _make_dir(self.basepath, set())
+        _write_file(os.path.join(self.basepath, "pack.mcmeta"), self.__encode({"type":"json", "data":self._mcmeta()}))
+
+    def __drop_manifest(self, current:bool=True):
+        # Remove the manifest older versions kept inside the pack folder, and with `current` the incremental one
+        paths = [os.path.join(self.basepath, MANIFEST_NAME)]
+        if current: paths.append(self.manifestpath)
+        for path in paths:
+            try: os.remove(path)
+            except FileNotFoundError: pass
+
+    def save_data(self, verbose_save:bool|None=None, incremental:bool=False, workers:int|None=None, use_processes:bool=True, stats:SaveStats|None=None):
+        '''
+        Confirms the tags and saves the datapack
+
+        With `incremental=True` a manifest of content hashes is kept next to
+        the pack folder (`<name>.pydatapack_manifest.json`): files whose bytes
+        did not change are skipped and files no longer in the pack are
+        deleted. Full saves remove the manifest, the next incremental save
+        writes every file again\n
+        With `workers` > 1 the JSON encoding runs in a pool of that many
+        processes (threads if `use_processes=False`) and the files are
+        written by a thread pool, the output is the same as the serial save\n
+        Pass a `SaveStats` as `stats` to collect the time, items and bytes
+        of every phase of the save\n
+        Returns a dict with the counts of `written`, `skipped` and `removed` files
+        '''
         verbose_save = self.verbose if verbose_save == None else verbose_save
+        counts = {"written":0, "skipped":0, "removed":0}
+        self.__check_output(self.zippath if self.save_to_zip else self.basepath)
         if self.verbose: 
             logger.info(f"{'-'*20} SAVING {'-'*20}")
             logger.info("Saving datapack...")
 
-        if self.verbose: logger.info("Confirming all tags...")
-        self.tags._confirm_tags()
+        self.__confirm_tags(stats)
+
+        if self.save_to_zip:
+            logger.info(f"{'-'*20} CREATING ZIP {'-'*20}")
+            counts["written"] = self.__save_zip(self.zippath, self.compresslevel, verbose_save, workers, use_processes, stats)
+            if self.verbose: logger.info("End of save")
+            if stats is not None: stats._finish()
+            return counts
 
         if verbose_save: 
             logger.info(f"{'-'*20} FILES AND FOLDERS {'-'*20}")
         else: logger.info("Verbose save is turned off")
-        
-        if len(self.__folders) == 0:
-            if verbose_save: logger.info("No folders to generate! Returning...")
-            return
-
-        for folder in self.__folders:
-            if verbose_save: logger.info(f"New folder: {os.path.join(self.datapath,folder)}")
-            self.__make_dir(os.path.join(self.datapath,folder), verbose_save=verbose_save)
 
+        if incremental:
+            self.__write_mcmeta()
+            self.__drop_manifest(current=False)
+            self.__save_incremental(counts, verbose_save, workers, use_processes, stats)
+            if self.verbose: logger.info(f"End of save: {counts['written']} written, {counts['skipped']} skipped, {counts['removed']} removed")
+            if stats is not None: stats._finish()
+            return counts
+        
+        self.__write_mcmeta()
+        self.__drop_manifest()
         if len(self._files) == 0: 
             if verbose_save: logger.info("No _files to generate! Returning...")
-            return
+            return counts
+
+        start = perf_counter()
+        folders = _plan_dirs(self._files)
+        if verbose_save:
+            for folder in folders: logger.info(f"New folder: {os.path.join(self.datapath,folder)}")
+        created = _make_dirs(self.datapath, folders)
+        if stats is not None: stats.add("dirs", perf_counter() - start, len(created))
         
-        for file in self._files:
-            if verbose_save: logger.info(f"New file: {file}")
-            with open(os.path.join(self.datapath, file), "w") as fl:
-                if self._files[file]["type"] == "json": json.dump(self._files[file]["data"], fl, indent=4)
-                else: fl.write(self._files[file]["data"])
+        with _FileWriter(workers, stats) as writer:
+            for file, payload in self.__iter_encoded(self._files, workers, use_processes, stats):
+                if verbose_save: logger.info(f"New file: {file}")
+                writer.write(os.path.join(self.datapath, file), payload)
+                counts["written"] += 1
+
+        if self.verbose: logger.info("End of save")
+        if stats is not None: stats._finish()
+        return counts
+
+    def __payloads(self, file:str, stream:bool=True):
+        # (path, payload) pairs of a registered file: itself, or the parts of a line stream
+        if self._files.entry_type(file) == "lines": yield from self._files[file]["data"].parts(file, stream)
+        else: yield file, self._files.encoded(file)
+
+    def __iter_encoded(self, files, workers:int|None, use_processes:bool, stats:SaveStats|None=None):
+        # Yield (file, payload) pairs in order, encoding batches in a pool when workers are set
+        # Line streams yield iterators of byte chunks, to be consumed in order
+        if stats is not None:
+            yield from stats.timed(self.__iter_encoded(files, workers, use_processes))
+            return
+        if not workers or workers <= 1:
+            for file in files: yield from self.__payloads(file)
+            return
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        batch_size = workers * ENCODE_BATCH
+        files = iter(files)
+        with pool_cls(max_workers=workers) as pool:
+            while batch := list(islice(files, batch_size)):
+                # Entries already held as bytes by the file store, read from a loaded pack or streamed, skip the pool
+                lazy = [self._files.entry_type(file) in LAZY_TYPES for file in batch]
+                blobs = [None if is_lazy else self._files.blob(file) for file, is_lazy in zip(batch, lazy)]
+                entries = [self._files[file] for file, is_lazy, blob in zip(batch, lazy, blobs) if not is_lazy and blob is None]
+                encoded = pool.map(self.__encode, entries, chunksize=ENCODE_CHUNK)
+                for file, is_lazy, blob in zip(batch, lazy, blobs):
+                    if is_lazy: yield from self.__payloads(file)
+                    else: yield file, next(encoded) if blob is None else blob
+
+    def __save_incremental(self, counts:dict, verbose_save:bool, workers:int|None, use_processes:bool, stats:SaveStats|None):
+        # Write only the files whose content hash changed since the last save
+        import hashlib
+        manifest_path = self.manifestpath
+        try:
+            with open(manifest_path, "r") as mf: old_manifest = json.load(mf)
+        except (FileNotFoundError, json.JSONDecodeError): old_manifest = {}
+
+        manifest, created = {}, set()
+        with _FileWriter(workers, stats) as writer:
+            for file, payload in self.__iter_encoded(self._files, workers, use_processes, stats):
+                path = os.path.join(self.datapath, file)
+                hasher = None
+                if isinstance(payload, bytes):
+                    digest = manifest[file] = hashlib.blake2b(payload, digest_size=16).hexdigest()
+                    if old_manifest.get(file) == digest and os.path.exists(path):
+                        counts["skipped"] += 1
+                        continue
+                else:
+                    # Streamed functions are always written, and hashed on the way
+                    hasher = hashlib.blake2b(digest_size=16)
+                    payload = _hashing(payload, hasher)
+                folder = os.path.dirname(path)
+                if folder not in created:
+                    start = perf_counter()
+                    _make_dir(folder, created)
+                    if stats is not None: stats.add("dirs", perf_counter() - start, 1)
+                if verbose_save: logger.info(f"New file: {file}")
+                writer.write(path, payload)
+                if hasher is not None: manifest[file] = hasher.hexdigest()
+                counts["written"] += 1
+
+        for file in old_manifest.keys() - manifest.keys():
+            if verbose_save: logger.info(f"Removing file: {file}")
+            try: os.remove(os.path.join(self.datapath, file))
+            except FileNotFoundError: pass
+            counts["removed"] += 1
+            # Drop the folders left empty by the removal
+            folder = os.path.dirname(os.path.join(self.datapath, file))
+            while folder != self.datapath:
+                try: os.rmdir(folder)
+                except OSError: break
+                folder = os.path.dirname(folder)
+
+        with open(manifest_path, "w") as mf: json.dump(manifest, mf)
+
+    def save_zip(self, file:PathLike|str|BinaryIO|None=None, compresslevel:int|None=None, verbose_save:bool|None=None, workers:int|None=None, use_processes:bool=True,
+                 stats:SaveStats|None=None):
+        '''
+        Confirms the tags and streams the whole datapack into a zip archive
+
+        `file` can be a path or any writable binary file-like object,
+        defaults to `<cwd>/<name>.zip`\n
+        `compresslevel` is passed to zipfile (0-9, `None` for the zlib default)\n
+        `workers`, `use_processes` and `stats` work as in `save_data`\n
+        Entries are sorted and timestamped with a fixed date, so the same
+        content always produces a byte-identical archive
+        '''
+        verbose_save = self.verbose if verbose_save == None else verbose_save
+        file = self.zippath if file is None else file
+        self.__check_output(file)
+        self.__confirm_tags(stats)
+        self.__save_zip(file, self.compresslevel if compresslevel is None else compresslevel, verbose_save, workers, use_processes, stats)
+        if stats is not None: stats._finish()
+
+    def __save_zip(self, file:PathLike|str|BinaryIO, compresslevel:int|None, verbose_save:bool, workers:int|None=None, use_processes:bool=True, stats:SaveStats|None=None) -> int:
+        # Serialize every file straight into the archive, returns the number of data files written
+        if self.verbose: logger.info(f"Creating zip archive")
+        counts = {"written":0}
+        if stats is None: _write_zip(file, self.__zip_entries(verbose_save, workers, use_processes, counts=counts), compresslevel)
+        else:
+            # The archive phase is the zip time minus the serialization done while feeding it
+            start, serialized = perf_counter(), stats.phases["serialize"]["seconds"]
+            archived = _write_zip(file, self.__zip_entries(verbose_save, workers, use_processes, stats, counts), compresslevel)
+            stats.add("archive", perf_counter() - start - (stats.phases["serialize"]["seconds"] - serialized), counts["written"] + 1, archived)
+        if self.verbose: logger.info("Zip archive created")
+        return counts["written"]
+
+    def __zip_entries(self, verbose_save:bool, workers:int|None, use_processes:bool, stats:SaveStats|None=None, counts:dict|None=None):
+        # Lazily yield (archive name, payload) pairs, counting the data files in counts["written"]
+        yield "pack.mcmeta", self.__encode({"type":"json", "data":self._mcmeta()})
+        for file_path, payload in self.__iter_encoded(sorted(self._files), workers, use_processes, stats):
+            if verbose_save: logger.info(f"New file: {file_path}")
+            yield "/".join(("data", *file_path.split(os.sep))), payload
+            if counts is not None: counts["written"] += 1
+
+    async def save_data_async(self, verbose_save:bool|None=None, concurrency:int=8):
+        '''
+        Awaitable `save_data` for asyncio applications
+
+        Tag confirmation, folder creation, encoding and writing run in
+        worker threads, at most `concurrency` files at a time, so the event
+        loop is never blocked. Cancelling the task stops the save after the
+        files being written. Zip packs are streamed to their path in one
+        worker thread, as with `save_zip`\n
+        Returns a dict with the counts of `written`, `skipped` and `removed` files
+        '''
+        import asyncio, threading
+        verbose_save = self.verbose if verbose_save == None else verbose_save
+        counts = {"written":0, "skipped":0, "removed":0}
+        self.__check_output(self.zippath if self.save_to_zip else self.basepath)
 
         if self.save_to_zip:
-            logger.info(f"{'-'*20} CREATING ZIP {'-'*20}")
-            if self.verbose: logger.info("Creating zip archive")
-            make_archive(self.name, 'zip', self.temp_path, verbose=verbose_save)
+            cancelled = threading.Event()
+            def export():
+                self.__confirm_tags()
+                _write_zip(self.zippath, _cancellable(self.__zip_entries(verbose_save, None, False, counts=counts), cancelled), self.compresslevel)
+            try: await asyncio.to_thread(export)
+            finally: cancelled.set()
+            return counts
+
+        def prepare() -> list:
+            # Confirm tags, write pack.mcmeta and create the folders, returns the files to write
+            self.__confirm_tags()
+            self.__write_mcmeta()
+            self.__drop_manifest()
+            files = list(self._files)
+            _make_dirs(self.datapath, _plan_dirs(files))
+            return files
+        files = await asyncio.to_thread(prepare)
+
+        def write(file) -> int:
+            # Write a file, or the parts of a split function, returns how many were written
+            written = 0
+            for path, payload in self.__payloads(file):
+                _write_file(os.path.join(self.datapath, path), payload)
+                written += 1
+            return written
+
+        pending = set()
+        try:
+            for file in files:
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done: counts["written"] += task.result()
+                if verbose_save: logger.info(f"New file: {file}")
+                pending.add(asyncio.ensure_future(asyncio.to_thread(write, file)))
+            if pending: counts["written"] += sum(await asyncio.gather(*pending))
+        finally:
+            for task in pending: task.cancel()
+        if self.verbose: logger.info("End of save")
+        return counts
 
-            if self.verbose: logger.info("Cleaning up temp directory")
-            self.temp_dir.cleanup()
+    async def export_zip_async(self, compresslevel:int|None=None) -> bytes:
+        '''
+        Builds the zip archive in a worker thread and returns it as bytes,
+        without touching the disk
 
-        if self.verbose: logger.info("End of save")
-    
-    def get_ids_from_pattern(self, pattern: str):
-        
-        """
-        Recursively expand the first parenthesized group of alternatives
-        in the pattern, until no more are left.
-        """
-        m = re.search(r'\(([^()]+)\)', pattern)
-        if not m:
-            return [pattern]
-        
-        variants = []
-        whole_group = m.group(0)
-        inner = m.group(1)
-        options = inner.split('|')
-        
-        for opt in options:
-            new_pattern = pattern[:m.start()] + opt + pattern[m.end():]
-            variants.extend(self.get_ids_from_pattern(new_pattern))
-        
-        return variants
+        The archive is the same as the one written by `save_zip`, cancelling
+        the task stops the export thread at the next file
+        '''
+        import asyncio, io, threading
+        compresslevel = self.compresslevel if compresslevel is None else compresslevel
+        cancelled = threading.Event()
+        def export():
+            self.__confirm_tags()
+            buffer = io.BytesIO()
+            _write_zip(buffer, _cancellable(self.__zip_entries(False, None, False), cancelled), compresslevel)
+            return buffer.getvalue()
+        try: return await asyncio.to_thread(export)
+        finally: cancelled.set()
+
+    async def stream_zip_async(self, compresslevel:int|None=None, chunk_size:int=ZIP_STREAM_CHUNK):
+        '''
+        Async iterator over the chunks of the zip archive, built in a worker thread
 
-    def def_load(self, data: str|None = None):
-        # Define load function
-        if self.verbose: logger.info("Defining all paths to load function")
+        Meant to be served directly, e.g. as a streaming HTTP response: only
+        a few chunks are buffered ahead of the consumer. The archive is
+        written for an unseekable stream, so its bytes differ from `save_zip`
+        (every entry is followed by a data descriptor). Stopping the
+        iteration or cancelling the task stops the export thread
+        '''
+        import asyncio, threading
+        compresslevel = self.compresslevel if compresslevel is None else compresslevel
+        loop = asyncio.get_running_loop()
+        chunks, cancelled = asyncio.Queue(), threading.Event()
+        sink = _ChunkSink(loop, chunks, cancelled, chunk_size)
+        def export():
+            try:
+                self.__confirm_tags()
+                _write_zip(sink, _cancellable(self.__zip_entries(False, None, False), cancelled), compresslevel)
+                if sink.buffer: sink.send(bytes(sink.buffer))
+                sink.send(None)
+            except _ExportCancelled: pass
+            except Exception as e:
+                try: sink.send(e)
+                except _ExportCancelled: pass
+        producer = loop.run_in_executor(None, export)
+        try:
+            while True:
+                item = await chunks.get()
+                sink.slots.release()
+                if item is None: break
+                if isinstance(item, Exception): raise item
+                yield item
+            await producer
+        finally: cancelled.set()
+
+    def build_targets(self, targets, workers:int|None=None, save_to_zip:bool|None=None, compresslevel:int|None=None):
+        '''
+        Builds the pack once for every target, in parallel worker processes
+
+        `targets` is a list of game versions ("1.20.4", resolved with
+        `version_to_pack`) or pack formats (ints), every target is saved to
+        `<cwd>/<name>_<target>` (a folder, or a zip if `save_to_zip`, which
+        defaults to the pack setting). Folders renamed in pack format 48
+        (`function`/`functions`, `recipe`/`recipes`, the tag folders...) are
+        resolved per target\n
+        Returns a dict of target to output path
+        '''
+        save_to_zip = self.save_to_zip if save_to_zip is None else save_to_zip
+        compresslevel = self.compresslevel if compresslevel is None else compresslevel
+        self.__confirm_tags()
 
-        if self.pack_format >= 48: funct_folder = "function"
-        else: funct_folder = "functions"
+        # Every file is encoded once, the workers only remap paths and write
+        files, layouts = [], {}
+        for file in self._files:
+            for path, payload in self.__payloads(file, stream=False):
+                files.append((path, payload))
+                layout = _folder_layout(path)
+                if layout is not None: layouts[path] = layout
+
+        jobs = {}
+        cwd = os.getcwd()
+        for target in targets:
+            pack_format = target if isinstance(target, int) else version_to_pack(target)
+            mcmeta = {**self._mcmeta(), "pack":{"description":self.desc, "pack_format":pack_format}}
+            out_path = os.path.join(cwd, f"{self.name}_{target}") + (".zip" if save_to_zip else "")
+            self.__check_output(out_path)
+            jobs[target] = (out_path, save_to_zip, compresslevel, self.__encode({"type":"json", "data":mcmeta}), pack_format)
+
+        if self.verbose: logger.info(f"Building {len(jobs)} targets: {', '.join(map(str, jobs))}")
+        workers = min(len(jobs), os.cpu_count() or 1) if workers is None else workers
+        if workers <= 1:
+            for job in jobs.values(): _emit_target(*job, files, layouts)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_target_worker, initargs=(files, layouts)) as pool:
+                for future in [pool.submit(_emit_target, *job) for job in jobs.values()]: future.result()
+        if self.verbose: logger.info("All targets built")
+        return {target: job[0] for target, job in jobs.items()}
+
+    def get_ids_from_pattern(self, pattern: str):
+        '''
+        Expand every parenthesized group of alternatives in the pattern,
+        groups can be nested: `minecraft:(oak|dark_(oak|prismarine))_stairs`
 
-        self._add_folders(os.path.join("minecraft","tags",funct_folder))
+        Returns a list, use `iter_ids_from_pattern` to stream the ids
+        '''
+        return list(compile_pattern(pattern))
 
-        if self.verbose: logger.info("Minecraft namespace paths created")
-        self._add_folders(os.path.join(self.namespace, funct_folder))
-        self._files[os.path.join("minecraft", "tags", funct_folder, "load.json")] = {"type":"json", "data":{"values":[f"{self.namespace}:load"]}}
+    def iter_ids_from_pattern(self, pattern: str):
+        # Lazily yield the ids of a pattern, the iterator can be passed to the tag and Elixirum methods
+        return iter(compile_pattern(pattern))
 
-        if data == None: self._files[os.path.join(self.namespace, funct_folder, "load.mcfunction")] = {"type":"text", "data":'tellraw @a {"text":"The '+self.name+' datapack has loaded correctly", "color":"green"}'}
-        else: self._files[os.path.join(self.namespace, funct_folder, "load.mcfunction")] = {"type":"text", "data":data}
+    def count_ids_from_pattern(self, pattern: str) -> int:
+        # Number of ids a pattern expands to, without expanding it
+        return compile_pattern(pattern).count()
 
-        if self.verbose: logger.info("All _files created")
+    def __add_func_file(self, head:tuple, tail:tuple, entry:dict):
+        # Register a file stored under the function folder of the pack format
+        self._files[os.path.join(*head, _func_folder(self.pack_format), *tail)] = entry
 
-    def def_tick(self, data: str|None = None):
-        # Define tick function
-        if self.verbose: logger.info("Defining all paths to tick function")
+    def __func_body(self, name:str, data, split_lines:int|None) -> dict:
+        # Entry of a function body: text, or lines consumed at save time
+        if isinstance(data, str) and split_lines is None: return {"type":"text", "data":data}
+        if isinstance(data, str): data = data.splitlines()
+        return {"type":"lines", "data":LineStream(data, split_lines, f"{self.namespace}:{name}")}
 
-        if self.pack_format >= 48: funct_folder = "function"
-        else: funct_folder = "functions"
+    def def_load(self, data=None, split_lines:int|None=None):
+        '''
+        Define load function
 
-        self._add_folders(os.path.join("minecraft","tags",funct_folder))
+        `data` is the body as a string, or an iterable of command lines
+        (or a function returning one) written in chunks at save time, see
+        `def_func`
+        '''
+        if self.verbose: logger.info("Defining all paths to load function")
 
-        if self.verbose: logger.info("Minecraft namespace paths created")
-        self._add_folders(os.path.join(self.namespace, funct_folder))
-        self._files[os.path.join("minecraft","tags",funct_folder,"tick.json")] = {"type":"json", "data":{"values":[f"{self.namespace}:tick"]}}
+        self.__add_func_file(("minecraft", "tags"), ("load.json",), {"type":"json", "data":{"values":[f"{self.namespace}:load"]}})
 
-        if data == None: self._files[os.path.join(self.namespace, funct_folder, "tick.mcfunction")] = {"type":"text", "data":'tellraw @a "Tick!"'}
-        else: self._files[os.path.join(self.namespace, funct_folder, "tick.mcfunction")] = {"type":"text", "data":data}
+        if data == None: data = 'tellraw @a {"text":"The '+self.name+' datapack has loaded correctly", "color":"green"}'
+        self.__add_func_file((self.namespace,), ("load.mcfunction",), self.__func_body("load", data, split_lines))
 
         if self.verbose: logger.info("All _files created")
 
-    def def_func(self, name:str, data:str|None):
-        # Define a new function
-        if self.verbose: logger.info(f"Defining new \"{name}\" function")
+    def def_tick(self, data=None, split_lines:int|None=None):
+        # Define tick function, `data` works as in `def_load`
+        if self.verbose: logger.info("Defining all paths to tick function")
+
+        self.__add_func_file(("minecraft", "tags"), ("tick.json",), {"type":"json", "data":{"values":[f"{self.namespace}:tick"]}})
 
-        if self.pack_format >= 48: funct_folder = "function"
-        else: funct_folder = "functions"
+        if data == None: data = 'tellraw @a "Tick!"'
+        self.__add_func_file((self.namespace,), ("tick.mcfunction",), self.__func_body("tick", data, split_lines))
 
-        if os.path.join(self.namespace, funct_folder) not in self.__folders: 
-            if self.verbose: logger.info(f"{self.namespace} namespace paths created")
-            self._add_folder(os.path.join(self.namespace, funct_folder))
+        if self.verbose: logger.info("All _files created")
+
+    def def_func(self, name:str, data, split_lines:int|None=None):
+        '''
+        Define a new function
+
+        `data` is the body as a string, or an iterable of command lines, or a
+        function returning one. Lines are only read when saving and written
+        in chunks, so large generated bodies never sit in memory as a whole.
+        A generator can only be saved once\n
+        With `split_lines`, the body is cut into `name.mcfunction`,
+        `name_2.mcfunction`... of at most that many lines, each part running
+        the next one with a `function` command
+        '''
+        if self.verbose: logger.info(f"Defining new \"{name}\" function")
 
-        if data == None: self._files[os.path.join(self.namespace, funct_folder, f"{name}.mcfunction")] = {"type":"text", "data":'tellraw @a {"text":"This function has no data inside", "color":"red"}'}
-        else: self._files[os.path.join(self.namespace, funct_folder, f"{name}.mcfunction")] = {"type":"text", "data":data}
\ No newline at end of file
+        if data == None: data = 'tellraw @a {"text":"This function has no data inside", "color":"red"}'
+        self.__add_func_file((self.namespace,), (f"{name}.mcfunction",), self.__func_body(name, data, split_lines))
@@ -1,52 +1,132 @@
 import os
 import json
 
-from pydatapack.packcreator import logger, essence_blacklist_file
+from collections.abc import Mapping
+
+from pydatapack.packcreator import logger, _load_data
+
+ESSENCE_CATEGORIES = ("none", "offensive", "defensive", "enhancing", "diminishing")
+
+# Parameters of an essence, in the order of new_essence
+ESSENCE_ARGS = ("max_ampl", "max_dur", "category", "min_ingredient", "min_quality")
 
 class Elixirum:
     def __init__(self, dtpk):
         # Initialize Elixirum class
         self.dtpk = dtpk
         self.__version__ = "0.2.2"
-        self._removed_tags = []
+        self._removed_tags = set()
     
-    def new_essence(self, effect:str, max_ampl:int, max_dur:int, category:str, min_ingredient: int, min_quality: int):
-        # Create a new essence
+    def __essence(self, effect:str, max_ampl:int, max_dur:int, category:str, min_ingredient: int, min_quality: int):
+        # Validate an essence and register its file
         category = category.lower()
-        if self.dtpk.verbose: logger.info(f"New essence...")
-        if category not in ["none", "offensive", "defensive", "enhancing", "diminishing"]: 
+        if category not in ESSENCE_CATEGORIES: 
             if self.dtpk.verbose: logger.warning(f"Category \"{category}\" is not valid, setting to none")
             category = "none"
-        if self.dtpk.verbose: logger.info(f"Creating new essence with effect \"{effect}\", max amplifier {max_ampl}, max duration {max_dur}, category \"{category}\", min ingredient {min_ingredient} and min quality {min_quality}")
-        self.dtpk._add_folders(os.path.join("elixirum","elixirum","essence"))
-        self.dtpk._files[os.path.join("elixirum","elixirum","essence", f"{effect.split(':')[-1]}.json")] = {"type":"json", "data":{"category":category, "max_amplifier":max_ampl, "max_duration":max_dur, "mob_effect":effect, "required_ingredients":min_ingredient, "required_quality":min_quality}}
+        path = os.path.join("elixirum","elixirum","essence", f"{effect.split(':')[-1]}.json")
+        # Rows of a NumPy table with string columns hold every field as a string
+        data = {"category":category, "max_amplifier":int(max_ampl), "max_duration":int(max_dur), "mob_effect":effect, "required_ingredients":int(min_ingredient), "required_quality":int(min_quality)}
+        self.dtpk._files[path] = {"type":"json", "data":data}
+        self.dtpk._index(path, data)
+
+    def new_essence(self, effect:str, max_ampl:int, max_dur:int, category:str, min_ingredient: int, min_quality: int):
+        # Create a new essence
+        if self.dtpk.verbose: logger.info(f"New essence...")
+        if self.dtpk.verbose: logger.info(f"Creating new essence with effect \"{effect}\", max amplifier {max_ampl}, max duration {max_dur}, category \"{category.lower()}\", min ingredient {min_ingredient} and min quality {min_quality}")
+        self.__essence(effect, max_ampl, max_dur, category, min_ingredient, min_quality)
+
+    def new_essences(self, table) -> int:
+        '''
+        Create the essences of a table in one pass
+
+        `table` is a mapping of effect id to a dict of the `new_essence`
+        arguments, or an iterable of rows `(effect, max_ampl, max_dur,
+        category, min_ingredient, min_quality)` such as a NumPy array, whose
+        numeric fields are cast with `int`. Returns the number of essences
+        '''
+        rows = ((effect, *(params[arg] for arg in ESSENCE_ARGS)) for effect, params in table.items()) if isinstance(table, Mapping) else table
+        # A DataFrame iterates over its column labels, read its rows instead
+        if hasattr(rows, "to_numpy"): rows = rows.to_numpy()
+        if hasattr(rows, "tolist"): rows = rows.tolist()
+        count = 0
+        for row in rows:
+            self.__essence(*row)
+            count += 1
+        if self.dtpk.verbose: logger.info(f"Created {count} essences")
+        return count
+
+    def __merge_presets(self, presets:dict):
+        # Write {ingredient: {essence: weight}}, merged with the essences already set for each ingredient
+        for ingredient, essences in presets.items():
+            path = os.path.join("elixirum","elixirum","ingredient_preset", f"{ingredient.split(':')[-1]}.json")
+            if path in self.dtpk._files: essences = {**self.dtpk.read_entry(path).get("essences", {}), **essences}
+            self.dtpk._files[path] = {"type":"json", "data":{"essences": essences,"target": ingredient}}
+            self.dtpk._index(path, {"essences": essences,"target": ingredient})
 
     def new_ingredient_preset(self, essence:str|list, ingredient:str, weight:int):
-        # Create a new ingredient preset
-        self.dtpk._add_folders(os.path.join("elixirum","elixirum","ingredient_preset"))
-        essences = {}
+        # Create a new ingredient preset, or add the essences to the existing one
         if self.dtpk.verbose: logger.info(f"Creating ingredient preset with essence \"{essence}\" and ingredient \"{ingredient}\" with weight x{weight}")
-        if isinstance(essence, list): 
-            for ess in essence: essences[ess] = weight
-        else: essences[essence] = weight
-        self.dtpk._files[os.path.join("elixirum","elixirum","ingredient_preset", f"{ingredient.split(':')[-1]}.json")] = {"type":"json", "data":{"essences": essences,"target": ingredient}}
+        essences = dict.fromkeys([essence] if isinstance(essence, str) else essence, weight)
+        self.__merge_presets({ingredient: essences})
+
+    def new_ingredient_presets(self, table, ingredients:list|None = None, essences:list|None = None, scale:float = 1, cutoff:float = 1) -> int:
+        '''
+        Create the ingredient presets of an ingredient x essence weight table in one pass
+
+        `table` is a mapping of ingredient id to {essence: weight}, or a 2D
+        array (a NumPy array or nested lists) with one row per `ingredients`
+        label and one column per `essences` label. A labelled table (a pandas
+        DataFrame) is read as an array, its index and columns are the default
+        labels\n
+        Weights are multiplied by `scale` and rounded, weights below `cutoff`
+        are left out. With a NumPy array this runs on the whole matrix at once.
+        Essences are merged with the ones already set for each ingredient,
+        returns the number of presets written
+        '''
+        if isinstance(table, Mapping):
+            presets = {}
+            for ingredient, weights in table.items():
+                row = {essence: round(weight * scale) for essence, weight in weights.items()}
+                presets[ingredient] = {essence: weight for essence, weight in row.items() if weight >= cutoff and weight > 0}
+        else:
+            if hasattr(table, "to_numpy"):
+                # Rows of a DataFrame are ingredients and its columns essences, like an array
+                if ingredients is None: ingredients = list(table.index)
+                if essences is None: essences = list(table.columns)
+                table = table.to_numpy()
+            if ingredients is None or essences is None: raise ValueError("ingredients and essences labels are required for an array table")
+            if hasattr(table, "tolist"):
+                # Scale, round and cut off the whole matrix at once
+                weights = (table * scale).round()
+                rows = (weights * (weights >= cutoff)).astype(int).tolist()
+            else: rows = [[round(weight * scale) for weight in row] for row in table]
+            if len(rows) != len(ingredients): raise ValueError(f"Table has {len(rows)} rows for {len(ingredients)} ingredients")
+            presets = {}
+            for ingredient, row in zip(ingredients, rows):
+                if len(row) != len(essences): raise ValueError(f"Row of {ingredient} has {len(row)} weights for {len(essences)} essences")
+                merged = presets.setdefault(ingredient, {})
+                merged.update((essence, weight) for essence, weight in zip(essences, row) if weight >= cutoff and weight > 0)
+        presets = {ingredient: essences for ingredient, essences in presets.items() if essences}
+        self.__merge_presets(presets)
+        if self.dtpk.verbose: logger.info(f"Created {len(presets)} ingredient presets")
+        return len(presets)
 
     def new_configured_elixir(self, data:dict):
         # Create a new configured elixir
-        self.dtpk._add_folders(os.path.join("elixirum","elixirum","configured_elixir"))
         self.dtpk._files[os.path.join("elixirum","elixirum","configured_elixir", f"{data['variants'][0][0]['essence'].removeprefix('elixirum:')}.json")] = {"type":"json", "data":data}
     
     def __append_tag(self, tag: str, tag_type: str, id: str | list, replace: bool = False):
         # Append a tag
         if tag == "essence_whitelist":
-            ids = id if isinstance(id, list) else [id]
-            self._removed_tags.extend(i for i in ids if i in essence_blacklist_file["essence_blacklist.json"]["values"])
-            if self.dtpk.verbose: logger.warning(f"Whitelisted item is in blacklist! Removing {ids} from blacklist")
-        
+            ids = [id] if isinstance(id, str) else list(id)
+            blacklisted = set(ids).intersection(_load_data("essence_blacklist_file.json")["essence_blacklist.json"]["values"])
+            if len(blacklisted) > 0:
+                self._removed_tags.update(blacklisted)
+                if self.dtpk.verbose: logger.warning(f"Whitelisted item is in blacklist! Removing {sorted(blacklisted)} from blacklist")
+            id = ids
 
-        data = {"tag": tag, "type": tag_type, "id": id, "replace": replace, "namespace":"elixirum"}
-        if self.dtpk.verbose: logger.debug(f"Creating tag \"{tag}\" with type \"{tag_type}\" and id \"{id}\" {data}")
-        self.dtpk.tags._all_tags.append(data)
+        if self.dtpk.verbose: logger.debug(f"Creating tag \"{tag}\" with type \"{tag_type}\" and id \"{id}\" in namespace elixirum")
+        self.dtpk.tags._register(tag, tag_type, id, replace, "elixirum")
 
     def new_heat_source(self, block: str|list, replace: bool = False): 
         # Add a new heat source
@@ -1,22 +1,29 @@
+import csv
+import json
 import os
 
+from itertools import islice
 from pydatapack.packcreator import logger
 
+# Recipe record fields converted from CSV cells, other cells holding JSON lists/objects are parsed
+CSV_CASTS = {"xp": float, "cookingtime": int, "count": int}
+
+# Policies for recipes whose file name is already taken
+COLLISION_POLICIES = ("overwrite", "suffix", "report", "error")
+
 class Recipe:
-    def __init__(self, dtpk, namespace, _files, __folders, __filters, verbose):
+    def __init__(self, dtpk, namespace, _files, __filters, verbose):
         # Initialize Recipe class
         self.dtpk = dtpk
         self.namespace = namespace
         self._files = _files
-        self.__folders = __folders
         self.__filters = __filters
         self.verbose = verbose
-        self.dir_made = False
-
-    def __new_recipe_folder(self):
-        if self.dir_made: return
-        self.__folders.append(os.path.join(self.namespace, "recipe"))
-        self.dir_made = True
+        self.on_collision = "overwrite"
+        self.__next_suffix = {}
+        self.__summary = None
+        # Recipe files replaced by a later recipe, reported by check_references
+        self._overwritten = []
 
     def __get_count(self, output:str|dict):
         # Get count from output
@@ -26,6 +33,34 @@ class Recipe:
         else: count = 1
         return output, count
 
+    def __register(self, output:str, data:dict):
+        # Register a recipe file named after the output id, resolving name collisions
+        name = output.split(':')[-1]
+        path = os.path.join(self.namespace, "recipe", f"{name}.json")
+        if path in self._files:
+            if self.__summary is not None: self.__summary["collisions"].append(path)
+            match self.on_collision:
+                case "suffix":
+                    # Find the first free name_N, remembering where the last search ended
+                    index = self.__next_suffix.get(name, 2)
+                    while os.path.join(self.namespace, "recipe", f"{name}_{index}.json") in self._files: index += 1
+                    self.__next_suffix[name] = index + 1
+                    if self.verbose: logger.warning(f"Recipe file {path} already exists, saving as {name}_{index}.json")
+                    path = os.path.join(self.namespace, "recipe", f"{name}_{index}.json")
+                    if self.__summary is not None: self.__summary["renamed"] += 1
+                case "report":
+                    if self.verbose: logger.warning(f"Recipe file {path} already exists, skipping recipe for {output}")
+                    if self.__summary is not None: self.__summary["skipped"] += 1
+                    return None
+                case "error":
+                    raise ValueError(f"Recipe file {path} already exists")
+                case _:
+                    if self.verbose: logger.warning(f"Recipe file {path} already exists, overwriting it")
+                    self._overwritten.append(path)
+        self._files[path] = {"type":"json", "data":data}
+        self.dtpk._index(path, data)
+        return path
+
     def __check_category(self, category:str, type:int):
         # Check if category is valid
         match type:
@@ -39,64 +74,59 @@ class Recipe:
         # Create a shaped recipe
         output, count = self.__get_count(output)
         self.__check_category(category, 0)
-        self.__new_recipe_folder()
         data = {"type":"minecraft:crafting_shaped","category": category, "pattern":pattern, "key":inputs, "result":{"id":output, "count":count}}
-        self._files[os.path.join(self.namespace, "recipe", f"{''.join(output.split(':')[-1])}.json")] = {"type":"json", "data":data}
+        return self.__register(output, data)
 
     def shapeless(self, output:str|dict, inputs:list|tuple, category:str|None=None):
         # Create a shapeless recipe
         output, count = self.__get_count(output)
         self.__check_category(category, 0)
-        self.__new_recipe_folder()
         if len(inputs) > 9: 
             if self.verbose: 
                 logger.error(f"You can only put a max of 9 item in a recipe!")
                 logger.error(f"Raising ValueError...")
             raise ValueError("The maximum amount of inputs is 9")
         data = {"type":"minecraft:crafting_shapeless", "category": category, "ingredients":inputs, "result":{"id":output, "count":count}}
-        self._files[os.path.join(self.namespace, "recipe", f"{''.join(output.split(':')[-1])}.json")] = {"type":"json", "data":data}
+        return self.__register(output, data)
     
     def __smelting(self, output:str|dict, input:str|dict, xp:float, cookingtime:int, recipe_type:str, category:str|None=None):
         # Create a smelting recipe
         output, count = self.__get_count(output)
         if isinstance(input, dict): input = input["id"]
         self.__check_category(category, 1)
-        self.__new_recipe_folder()
         data = {"type":recipe_type, "category": category, "ingredient":{"item":input},"result":{"item":output,"count":count},"experience":xp,"cookingtime":cookingtime}
-        self._files[os.path.join(self.namespace, "recipe", f"{''.join(output.split(':')[-1])}.json")] = {"type":"json", "data":data}
+        return self.__register(output, data)
 
     def smelting(self, output:str|dict, input:str|dict, xp:float, cookingtime:int, category:str|None=None): 
         # Create a smelting recipe
-        self.__smelting(output, input, xp, cookingtime, "minecraft:smelting", category)
+        return self.__smelting(output, input, xp, cookingtime, "minecraft:smelting", category)
 
     def blasting(self, output:str|dict, input:str|dict, xp:float, cookingtime:int, category:str|None=None): 
         # Create a blasting recipe
-        self.__smelting(output, input, xp, cookingtime, "minecraft:blasting", category)
+        return self.__smelting(output, input, xp, cookingtime, "minecraft:blasting", category)
 
     def smoking(self, output:str|dict, input:str|dict, xp:float, cookingtime:int, category:str|None=None): 
         # Create a smoking recipe
-        self.__smelting(output, input, xp, cookingtime, "minecraft:smoking", category)
+        return self.__smelting(output, input, xp, cookingtime, "minecraft:smoking", category)
 
     def campfire_cooking(self, output:str|dict, input:str|dict, xp:float, cookingtime:int, category:str|None=None): 
         # Create a campfire cooking recipe
-        self.__smelting(output, input, xp, cookingtime, "minecraft:campfire_cooking", category)
+        return self.__smelting(output, input, xp, cookingtime, "minecraft:campfire_cooking", category)
 
     def stonecutting(self, output:str|dict, input:str|dict):
         # Create a stonecutting recipe
         output, count = self.__get_count(output)
         if isinstance(input, dict): input = input["id"]
-        self.__new_recipe_folder()
         data = {"type":"minecraft:stonecutting","ingredient":input,"result":output,"count":count}
-        self._files[os.path.join(self.namespace, "recipe", f"{''.join(output.split(':')[-1])}.json")] = {"type":"json", "data":data}
+        return self.__register(output, data)
     
     def smithing(self, base:str|dict, addition:str|dict, output:str|dict):
         # Create a smithing recipe
         if isinstance(base, dict): base = base["id"]
         if isinstance(addition, dict): addition = addition["id"]
         output, count = self.__get_count(output)
-        self.__new_recipe_folder()
         data = {"type":"minecraft:smithing","base":base,"addition":addition,"result":{"item":output,"count":count}}
-        self._files[os.path.join(self.namespace, "recipe", f"{''.join(output.split(':')[-1])}.json")] = {"type":"json", "data":data}
+        return self.__register(output, data)
 
     def remove(self, output: str):
         # Remove a recipe
@@ -104,4 +134,70 @@ class Recipe:
         if self.verbose: logger.info(f"The recipe in namespace {namespace} of {itemid} has been removed")
         self.__filters["block"] = [{"namespace":namespace,"path":f"recipe/{itemid}.json"}]
         if self.verbose: logger.info("Calling gen_new")
-        self.dtpk.gen_new()
\ No newline at end of file
+        self.dtpk.gen_new()
+
+    def bulk(self, records, on_collision:str="suffix", batch_size:int=1000):
+        '''
+        Creates recipes from an iterable of records, consumed lazily in batches
+
+        Every record is a dict with a `type` (shaped, shapeless, smelting,
+        blasting, smoking, campfire_cooking, stonecutting or smithing) and the
+        arguments of the matching method\n
+        `on_collision` decides what happens to a recipe whose file name is taken:
+        "suffix" saves it as name_2.json, name_3.json..., "report" skips it,
+        "error" raises ValueError and "overwrite" replaces the old one\n
+        Returns a summary dict with the `ingested`, `renamed` and `skipped`
+        counts and the list of `collisions` (the file names that were taken)
+        '''
+        if on_collision not in COLLISION_POLICIES: raise ValueError(f"on_collision must be one of {COLLISION_POLICIES}")
+        builders = {"shaped":self.shaped, "shapeless":self.shapeless, "smelting":self.smelting, "blasting":self.blasting, "smoking":self.smoking,
+                    "campfire_cooking":self.campfire_cooking, "stonecutting":self.stonecutting, "smithing":self.smithing}
+        summary = {"ingested":0, "renamed":0, "skipped":0, "collisions":[]}
+        previous_policy, self.on_collision = self.on_collision, on_collision
+        self.__summary = summary
+        records = iter(records)
+        try:
+            while batch := list(islice(records, batch_size)):
+                for record in batch:
+                    record = dict(record)
+                    recipe_type = record.pop("type", None)
+                    if recipe_type not in builders: raise ValueError(f"Unknown recipe type \"{recipe_type}\" in record {record}")
+                    if builders[recipe_type](**record) is not None: summary["ingested"] += 1
+                if self.verbose: logger.info(f"Ingested {summary['ingested']} recipes so far")
+        finally:
+            self.on_collision = previous_policy
+            self.__summary = None
+        return summary
+
+    def from_jsonl(self, path:os.PathLike|str, on_collision:str="suffix", batch_size:int=1000):
+        '''
+        Streams recipe records from a JSON Lines file into `bulk`
+
+        Every non-empty line is one record
+        '''
+        with open(path, "r", encoding="utf-8") as fl:
+            return self.bulk((json.loads(line) for line in fl if line.strip()), on_collision, batch_size)
+
+    def from_csv(self, path:os.PathLike|str, on_collision:str="suffix", batch_size:int=1000):
+        '''
+        Streams recipe records from a CSV file into `bulk`
+
+        The header names the record fields (`type`, `output`, `inputs`...),
+        cells holding JSON lists or objects are parsed, empty cells are left
+        out and a `count` column is merged into the output
+        '''
+        with open(path, "r", encoding="utf-8", newline="") as fl:
+            return self.bulk((self.__csv_record(row) for row in csv.DictReader(fl)), on_collision, batch_size)
+
+    def __csv_record(self, row:dict):
+        # Convert a CSV row to a recipe record
+        record = {}
+        for field, cell in row.items():
+            if field is None or cell is None: continue
+            cell = cell.strip()
+            if cell == "": continue
+            if field in CSV_CASTS: record[field] = CSV_CASTS[field](cell)
+            elif cell[0] in "[{": record[field] = json.loads(cell)
+            else: record[field] = cell
+        if "count" in record: record["output"] = {"id":record["output"], "count":record.pop("count")}
+        return record
@@ -1,50 +1,69 @@
 import os
 
-from pydatapack.packcreator import logger, essence_blacklist_file
+from pydatapack.packcreator import logger, _load_data
 
 class Tags:
     def __init__(self, dtpk):
         self.dtpk = dtpk
-        self._all_tags = []
-        self.__tag_names = ["heat_sources", "essence_blacklist", "essence_whitelist", "shelf_placeable"]
+        # (namespace, tag_type, tag) -> {"values": ordered set of ids, "replace": bool}
+        self._registry = {}
+        # (values, replace) of the tags of a loaded pack, merged with the registered ones
+        self.__upstream = {}
 
-    def __add_tag(self, tag:str, tag_type:str, id:str|list, replace:bool=False, namespace:str|None = None):
+    def __add_tag(self, tag:str, tag_type:str, id:list, replace:bool=False, namespace:str|None = None):
         # Add a tag
         if namespace: temp_namespace = namespace
         else: temp_namespace = self.dtpk.namespace
-        self.dtpk._add_folders(os.path.join(temp_namespace,"tags",tag_type))
-        if not isinstance(id, list): self.dtpk._files[os.path.join(temp_namespace,"tags", tag_type, f"{tag}.json")] = {"type":"json", "data":{"replace":replace,"values":[id]}}
-        else: self.dtpk._files[os.path.join(temp_namespace,"tags", tag_type, f"{tag}.json")] = {"type":"json", "data":{"replace":replace,"values":id}}
+        path = os.path.join(temp_namespace,"tags", tag_type, f"{tag}.json")
+        if path not in self.__upstream:
+            existing = self.dtpk._files.get(path)
+            data = self.dtpk.read_entry(path) if existing and existing["type"] == "raw" else {}
+            self.__upstream[path] = (data.get("values", []), bool(data.get("replace", False)))
+        upstream, upstream_replace = self.__upstream[path]
+        if upstream and not replace: id = list(dict.fromkeys([*upstream, *id]))
+        self.dtpk._files[path] = {"type":"json", "data":{"replace":replace or upstream_replace,"values":id}}
+
+    def _register(self, tag:str, tag_type:str, id:str|list, replace:bool=False, namespace:str|None = None):
+        '''
+        Used internally
+
+        Collects the ids of a tag in the registry, keyed by (namespace, tag_type, tag)\n
+        Duplicated ids are kept once, in insertion order
+        '''
+        key = (namespace or self.dtpk.namespace, tag_type, tag)
+        entry = self._registry.get(key)
+        if entry is None: entry = self._registry[key] = {"values":{}, "replace":False}
+        indexed = "xref" in vars(self.dtpk)
+        # The index needs the ids again, don't let a generator be consumed twice
+        if indexed and not isinstance(id, str): id = list(id)
+        if isinstance(id, str): entry["values"][id] = None
+        else: entry["values"].update(dict.fromkeys(id))
+        entry["replace"] = entry["replace"] or replace
+        if indexed: self.dtpk._index(os.path.join(key[0], "tags", tag_type, f"{tag}.json"), {"values":[id] if isinstance(id, str) else id}, add=True)
 
     def _confirm_tags(self):
         # Confirm tags
-        if not (len(self._all_tags) > 0): 
+        removed = self.dtpk.elixirum._removed_tags if "elixirum" in vars(self.dtpk) else ()
+        if not (len(self._registry) > 0 or len(removed) > 0): 
             if self.dtpk.verbose: logger.info(f"No tags to confirm")
             return
 
         if self.dtpk.verbose: logger.info(f"Confirming tags...")
 
-        if len(self.dtpk.elixirum._removed_tags) > 0:
-            blacklist = essence_blacklist_file["essence_blacklist.json"]["values"]
-            for id in self.dtpk.elixirum._removed_tags:
-                blacklist.remove(id)
-            self._all_tags.append({"tag":"essence_blacklist", "type":"item", "id":blacklist, "replace":True})
-        
-        for t in self.__tag_names:
-            tags_id, replace = [], []
-            for tag in self._all_tags:
-                if tag["tag"] == t: 
-                    if isinstance(tag["id"], list): tags_id.extend(tag["id"])
-                    else: tags_id.append(tag["id"])
-                    replace.append(tag["replace"])
-            if len(tags_id) > 0: 
-                if self.dtpk.verbose: 
-                    namespace_info = f" in namespace {tag.get('namespace')}" if tag.get("namespace", None) is not None else ""
-                    logger.debug(f"Adding tag \"{t}\" with ids {tags_id} and replace {any(replace)}{namespace_info}")
-                self.__add_tag(t, tag["type"], tags_id, any(replace), tag.get("namespace", None))
+        registry = self._registry
+        if len(removed) > 0:
+            # Replace the default blacklist with one that leaves out the whitelisted ids
+            key = ("elixirum", "item", "essence_blacklist")
+            blacklist = {id: None for id in _load_data("essence_blacklist_file.json")["essence_blacklist.json"]["values"] if id not in removed}
+            entry = registry.get(key, {"values":{}, "replace":True})
+            registry = {**registry, key: {"values":{**entry["values"], **blacklist}, "replace":True}}
+
+        for (namespace, tag_type, tag), entry in registry.items():
+            tags_id = list(entry["values"])
+            if self.dtpk.verbose: logger.debug(f"Adding tag \"{tag}\" with ids {tags_id} and replace {entry['replace']} in namespace {namespace}")
+            self.__add_tag(tag, tag_type, tags_id, entry["replace"], namespace)
     
-    def new_tag(self, tag: str, tag_type: str, id: str | list):
+    def new_tag(self, tag: str, tag_type: str, id: str | list, namespace: str | None = None):
         # Append a tag
-        if tag not in self.__tag_names: self.__tag_names.append(tag)
         if self.dtpk.verbose: logger.info(f"Creating tag \"{tag}\" with type \"{tag_type}\" and id \"{id}\"")
-        self._all_tags.append({"tag": tag, "type": tag_type, "id": id, "replace": False})
\ No newline at end of file
+        self._register(tag, tag_type, id, False, namespace)
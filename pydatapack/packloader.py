@@ -0,0 +1,57 @@
+import json
+import os
+import zipfile
+
+class SourceRef:
+    # A file of an existing pack, read only when its bytes are needed
+    __slots__ = ("source", "member")
+
+    def __init__(self, source, member:str):
+        self.source = source
+        self.member = member
+
+    def read(self) -> bytes:
+        return self.source.read(self.member)
+
+    def __repr__(self):
+        return f"SourceRef({self.source.path!r}, {self.member!r})"
+
+class PackSource:
+    '''
+    Read-only index of an existing pack, a folder or a zip
+
+    Building the index only lists the files under `data/`, their contents
+    are read on demand through `read`
+    '''
+    def __init__(self, path:os.PathLike|str):
+        self.path = os.fspath(path)
+        self.name = os.path.splitext(os.path.basename(os.path.normpath(self.path)))[0]
+        self.__zip = None
+        if os.path.isdir(self.path): return
+        if not zipfile.is_zipfile(self.path): raise ValueError(f"{self.path} is neither a pack folder nor a zip archive")
+        self.__zip = zipfile.ZipFile(self.path, "r")
+
+    def paths(self):
+        # Yield (path relative to data/ with os.sep, member) for every file of the pack
+        if self.__zip is not None:
+            for info in self.__zip.infolist():
+                if info.is_dir() or not info.filename.startswith("data/"): continue
+                yield os.path.join(*info.filename.split("/")[1:]), info.filename
+            return
+        datapath = os.path.join(self.path, "data")
+        for root, _, files in os.walk(datapath):
+            for file in files:
+                member = os.path.join(root, file)
+                yield os.path.relpath(member, datapath), member
+
+    def read(self, member:str) -> bytes:
+        if self.__zip is not None: return self.__zip.read(member)
+        with open(member, "rb") as fl: return fl.read()
+
+    def mcmeta(self) -> dict:
+        # Parsed pack.mcmeta of the pack
+        member = "pack.mcmeta" if self.__zip is not None else os.path.join(self.path, "pack.mcmeta")
+        return json.loads(self.read(member))
+
+    def close(self):
+        if self.__zip is not None: self.__zip.close()
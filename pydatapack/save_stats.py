@@ -0,0 +1,51 @@
+from time import perf_counter
+
+class SaveStats:
+    '''
+    Time, item and byte counts of every phase of a save
+
+    Pass an instance as `stats` to `save_data`/`save_zip`, the phases are
+    `tags` (tag confirmation), `dirs` (directory creation), `serialize`,
+    `write` and `archive` (zip compression and writing)\n
+    `callback(phase, numbers)` is called for every phase when the save ends,
+    `numbers` being a dict with `seconds`, `items` and `bytes`\n
+    The same instance can be reused, the numbers add up across saves
+    '''
+    PHASES = ("tags", "dirs", "serialize", "write", "archive")
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.phases = {phase: {"seconds":0.0, "items":0, "bytes":0} for phase in self.PHASES}
+
+    def add(self, phase:str, seconds:float, items:int=0, nbytes:int=0):
+        numbers = self.phases[phase]
+        numbers["seconds"] += seconds
+        numbers["items"] += items
+        numbers["bytes"] += nbytes
+
+    def timed(self, pairs, phase:str="serialize"):
+        # Wrap an iterator of (file, payload) pairs, charging the time spent producing them to the phase
+        # Streamed payloads are produced while written, their bytes are counted by the write phase
+        pairs = iter(pairs)
+        while True:
+            start = perf_counter()
+            try: file, payload = next(pairs)
+            except StopIteration: return
+            self.add(phase, perf_counter() - start, 1, len(payload) if isinstance(payload, bytes) else 0)
+            yield file, payload
+
+    def _finish(self):
+        if self.callback is None: return
+        for phase, numbers in self.phases.items(): self.callback(phase, dict(numbers))
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(numbers["seconds"] for numbers in self.phases.values())
+
+    def report(self) -> str:
+        # Human readable table of the phases
+        lines = [f"{'phase':<10} {'seconds':>10} {'items':>10} {'bytes':>14}"]
+        for phase, numbers in self.phases.items():
+            lines.append(f"{phase:<10} {numbers['seconds']:>10.4f} {numbers['items']:>10} {numbers['bytes']:>14}")
+        lines.append(f"{'total':<10} {self.total_seconds:>10.4f}")
+        return "\n".join(lines)
@@ -0,0 +1,117 @@
+import os
+
+# Fields of a recipe holding its inputs
+RECIPE_INPUT_FIELDS = ("key", "ingredients", "ingredient", "base", "addition", "template")
+
+def _ids(value):
+    # Item or tag ids in an ingredient value: a string, {"item"/"tag"/"id": ...}, or a list/dict of them
+    if isinstance(value, str): yield value
+    elif isinstance(value, dict):
+        if "item" in value: yield value["item"]
+        elif "id" in value: yield value["id"]
+        elif "tag" in value: yield f"#{value['tag']}"
+        else:
+            for v in value.values(): yield from _ids(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value: yield from _ids(v)
+
+def recipe_refs(data:dict):
+    # (id, role) pairs of a recipe: its inputs and its output
+    for field in RECIPE_INPUT_FIELDS:
+        if field in data:
+            for id in _ids(data[field]): yield id, "input"
+    for id in _ids(data.get("result", ())): yield id, "output"
+
+def file_refs(path:str, data) -> list:
+    # (id, role) pairs of a JSON file of the pack, found from where it sits in the pack
+    if not isinstance(data, dict): return []
+    parts = path.split(os.sep)
+    if len(parts) >= 3 and parts[1] == "recipe": return list(recipe_refs(data))
+    if len(parts) >= 4 and parts[1] == "tags": return [(id, "tag") for id in _ids(data.get("values", ()))]
+    if parts[:3] == ["elixirum", "elixirum", "essence"]: return [(id, "effect") for id in _ids(data.get("mob_effect", ()))]
+    if parts[:3] == ["elixirum", "elixirum", "ingredient_preset"]:
+        return [*((id, "target") for id in _ids(data.get("target", ()))), *((essence, "essence") for essence in data.get("essences", {}))]
+    return []
+
+class XRef:
+    '''
+    Reverse index of item, block and effect ids to the pack files referencing them
+
+    Every reference has a role: `input`/`output` (recipes), `tag` (tag
+    values), `target` and `essence` (ingredient presets), `effect`
+    (essences). Files of a loaded pack are not indexed until they are
+    overridden
+    '''
+    def __init__(self):
+        # id -> {path: set of roles}
+        self.__by_id = {}
+        # path -> set of ids
+        self.__by_path = {}
+
+    def add(self, path:str, refs):
+        # Add (id, role) references of a file
+        ids = self.__by_path.setdefault(path, set())
+        for id, role in refs:
+            self.__by_id.setdefault(id, {}).setdefault(path, set()).add(role)
+            ids.add(id)
+
+    def set(self, path:str, refs):
+        # Replace the references of a file
+        self.remove(path)
+        self.add(path, refs)
+
+    def remove(self, path:str):
+        for id in self.__by_path.pop(path, ()):
+            paths = self.__by_id[id]
+            paths.pop(path, None)
+            if not paths: del self.__by_id[id]
+
+    def references(self, id:str) -> dict:
+        # {path: roles} of the files referencing an id
+        return {path: set(roles) for path, roles in self.__by_id.get(id, {}).items()}
+
+    def __with_role(self, id:str, role:str) -> list:
+        return [path for path, roles in self.__by_id.get(id, {}).items() if role in roles]
+
+    def consumers(self, id:str) -> list:
+        # Recipes using the id as an input
+        return self.__with_role(id, "input")
+
+    def producers(self, id:str) -> list:
+        # Recipes with the id as output
+        return self.__with_role(id, "output")
+
+    def tags_of(self, id:str) -> list:
+        # Tag files listing the id
+        return self.__with_role(id, "tag")
+
+    def presets_of(self, id:str) -> list:
+        # Ingredient presets targeting the id
+        return self.__with_role(id, "target")
+
+    def ids(self):
+        return self.__by_id.keys()
+
+    def check(self, default_blacklist=(), whitelisted_defaults=(), overwritten=()) -> list:
+        '''
+        Single pass over the index, returns a list of (kind, id, paths) issues:
+
+        - `whitelisted_and_blacklisted`: ids in both the Elixirum essence whitelist and blacklist
+        - `blacklisted_preset`: blacklisted ids (default blacklist included) used as ingredient preset targets
+        - `output_collision`: ids produced by more than one recipe
+        - `overwritten_recipe`: the `overwritten` recipe files, replaced by a later recipe (id is the file path)
+        '''
+        blacklist = os.path.join("elixirum", "tags", "item", "essence_blacklist.json")
+        whitelist = os.path.join("elixirum", "tags", "item", "essence_whitelist.json")
+        default_blacklist = set(default_blacklist) - set(whitelisted_defaults)
+        issues = []
+        for id, paths in self.__by_id.items():
+            if blacklist in paths and whitelist in paths:
+                issues.append(("whitelisted_and_blacklisted", id, [blacklist, whitelist]))
+            presets = [path for path, roles in paths.items() if "target" in roles]
+            if presets and (blacklist in paths or id in default_blacklist) and whitelist not in paths:
+                issues.append(("blacklisted_preset", id, presets))
+            producers = [path for path, roles in paths.items() if "output" in roles]
+            if len(producers) > 1: issues.append(("output_collision", id, producers))
+        for path in overwritten: issues.append(("overwritten_recipe", path, [path]))
+        return issues